@@ -0,0 +1,108 @@
+"""
+Max — Child Process Tracking
+
+`tracked_run` is subprocess.run for skills, except every child is remembered
+while it runs so that shutting Max down (atexit, SIGTERM) takes its children
+with it instead of orphaning a half-finished dmesg/apt/pactl.
+"""
+
+import atexit
+import logging
+import os
+import signal
+import subprocess
+import threading
+
+logger = logging.getLogger("max.skills.process_tracker")
+
+_GRACE = 2.0  # Seconds between SIGTERM and SIGKILL at shutdown
+
+_procs: set[subprocess.Popen] = set()
+_procs_lock = threading.Lock()
+
+
+def _signal_group(proc: subprocess.Popen, sig: int):
+    try:
+        if os.getpgid(proc.pid) == proc.pid:
+            os.killpg(proc.pid, sig)  # Whole group — catches `sh -c "a | b"` pipelines too
+        else:
+            proc.send_signal(sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def terminate_all():
+    """SIGTERM every running tracked child's process group, then SIGKILL whatever is left."""
+    with _procs_lock:
+        procs = list(_procs)
+    if not procs:
+        return
+    logger.debug("Terminating %d child process(es).", len(procs))
+    for proc in procs:
+        _signal_group(proc, signal.SIGTERM)
+    for proc in procs:
+        try:
+            proc.wait(timeout=_GRACE)
+        except subprocess.TimeoutExpired:
+            _signal_group(proc, signal.SIGKILL)
+
+
+atexit.register(terminate_all)
+
+
+def _install_sigterm_hook():
+    """Chain onto SIGTERM so children die even when nothing else turns it into a clean exit."""
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def _on_sigterm(signum, frame):
+        terminate_all()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    try:
+        signal.signal(signal.SIGTERM, _on_sigterm)
+    except ValueError:
+        pass  # Not the main thread — atexit still covers normal shutdown
+
+
+_install_sigterm_hook()
+
+
+def tracked_run(args, *, input=None, capture_output: bool = False, timeout: float | None = None,
+                check: bool = False, **kwargs) -> subprocess.CompletedProcess:
+    """Drop-in for subprocess.run(): same arguments and result, but the child is tracked while it runs."""
+    if capture_output:
+        kwargs["stdout"] = subprocess.PIPE
+        kwargs["stderr"] = subprocess.PIPE
+    if input is not None:
+        kwargs["stdin"] = subprocess.PIPE
+    # Own process group, so shutdown can signal the whole tree. Pass False for commands that may
+    # need the terminal (e.g. a sudo password prompt) — then only the direct child is signalled.
+    kwargs.setdefault("start_new_session", True)
+    # Never pass preexec_fn/user/group/extra_groups/umask: they force a real fork(), copying the
+    # page tables of a process that may hold hundreds of MB of models. Without them CPython
+    # spawns via vfork(), whose cost doesn't grow with our RSS.
+
+    with subprocess.Popen(args, **kwargs) as proc:
+        with _procs_lock:
+            _procs.add(proc)
+        try:
+            stdout, stderr = proc.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            _signal_group(proc, signal.SIGKILL)
+            e.stdout, e.stderr = proc.communicate()
+            raise
+        except BaseException:
+            _signal_group(proc, signal.SIGKILL)
+            raise
+        finally:
+            with _procs_lock:
+                _procs.discard(proc)
+        retcode = proc.poll()
+
+    if check and retcode:
+        raise subprocess.CalledProcessError(retcode, proc.args, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(proc.args, retcode, stdout, stderr)
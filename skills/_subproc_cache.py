@@ -0,0 +1,57 @@
+"""
+Max — Cached Subprocess Runner
+
+Short-lived cache for read-only shell queries (lsmod, dmesg, ss, pactl, ufw
+status) that the agent loop tends to repeat within a few seconds. A hit skips
+the fork+exec entirely; mutating skills call `invalidate()` so the next query
+sees fresh state.
+"""
+
+import logging
+import subprocess
+import threading
+import time
+
+from skills._process_tracker import tracked_run
+
+logger = logging.getLogger("max.skills.subproc_cache")
+
+_CACHE: dict[tuple[str, ...], tuple[subprocess.CompletedProcess, float]] = {}
+_LOCK = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def cached_run(argv, ttl: float = 5, timeout: float = 10) -> subprocess.CompletedProcess:
+    """
+    subprocess.run(argv, capture_output=True, text=True, timeout=timeout), memoized
+    for `ttl` seconds per argv. Exceptions (missing binary, timeout) are not cached.
+    Treat the returned CompletedProcess as read-only — it is shared between callers.
+    `sudo ...` argv goes through the persistent privileged helper.
+    """
+    key = tuple(argv)
+    now = time.monotonic()
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None and now < entry[1]:
+            _stats["hits"] += 1
+            logger.debug("cache hit: %s (%d hits / %d misses)", " ".join(key), _stats["hits"], _stats["misses"])
+            return entry[0]
+        _stats["misses"] += 1
+
+    if key[0] == "sudo":
+        from skills._sudo_helper import sudo_run
+        result = sudo_run(list(key[1:]), timeout=timeout)
+    else:
+        result = tracked_run(list(key), capture_output=True, text=True, timeout=timeout)
+    with _LOCK:
+        _CACHE[key] = (result, time.monotonic() + ttl)
+    logger.debug("cache miss: %s (%d hits / %d misses)", " ".join(key), _stats["hits"], _stats["misses"])
+    return result
+
+
+def invalidate(*prefix: str):
+    """Drop cached results whose argv starts with `prefix` (everything when no prefix is given)."""
+    n = len(prefix)
+    with _LOCK:
+        for key in [k for k in _CACHE if k[:n] == prefix]:
+            del _CACHE[key]
@@ -0,0 +1,194 @@
+"""
+Max — Persistent Privileged Helper
+
+One long-lived `sudo -n bash` fed commands over stdin, so privileged skills
+pay sudo's PAM/audit setup once instead of on every call. When sudo needs a
+password (no NOPASSWD rule), `sudo -n` refuses and calls fall back to a plain
+`sudo <argv>` per call, exactly as before.
+"""
+
+import atexit
+import logging
+import os
+import re
+import secrets
+import select
+import shlex
+import signal
+import subprocess
+import threading
+import time
+
+from skills._process_tracker import tracked_run
+
+logger = logging.getLogger("max.skills.sudo_helper")
+
+_RETRY_AFTER = 60.0  # Seconds before trying to start the helper again after sudo -n refused
+
+_proc: subprocess.Popen | None = None
+_lock = threading.Lock()
+_unavailable_until = 0.0
+
+
+class _HelperDied(Exception):
+    pass
+
+
+# Job control puts every command in its own process group; on SIGUSR1 (which sudo relays to
+# bash) the helper SIGKILLs that group — the command runs as root, so we can't signal it ourselves.
+_SETUP = "set -m; trap 'kill -KILL -- -$__pid 2>/dev/null' USR1\n"
+
+
+def _spawn() -> subprocess.Popen:
+    proc = subprocess.Popen(
+        ["sudo", "-n", "bash", "--noprofile", "--norc", "-s"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        bufsize=0, start_new_session=True,
+    )
+    try:
+        proc.stdin.write(_SETUP.encode())
+    except BrokenPipeError:
+        pass  # sudo -n refused; the first exchange reports it
+    return proc
+
+
+def _kill_running(proc: subprocess.Popen):
+    """Kill the command the helper is stuck on (its whole group), then shut the helper down and reap it."""
+    try:
+        proc.send_signal(signal.SIGUSR1)
+        proc.stdin.close()  # bash exits at EOF once the killed job is reaped
+        proc.wait(timeout=2)
+    except Exception:
+        proc.terminate()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def _stop():
+    global _proc
+    if _proc is not None:
+        try:
+            _proc.stdin.close()  # bash exits at EOF
+            _proc.wait(timeout=2)
+        except Exception:
+            _proc.terminate()  # sudo relays the signal to its root child
+        _proc = None
+
+
+atexit.register(_stop)
+
+
+def _exchange(proc: subprocess.Popen, command: str, timeout: float) -> tuple[int, str, str]:
+    """Run one command in the helper; returns (returncode, stdout, stderr)."""
+    marker = f"__MAX_SUDO_{secrets.token_hex(8)}__".encode()
+    try:
+        proc.stdin.write(
+            f"{{ {command}\n}} </dev/null & __pid=$!; wait $__pid; __rc=$?; "
+            f"printf '\\n%s %d\\n' {marker.decode()} $__rc; printf '\\n%s\\n' {marker.decode()} >&2\n".encode()
+        )
+    except BrokenPipeError:
+        raise _HelperDied(proc.stderr.read().decode(errors="replace").strip())
+    out_fd, err_fd = proc.stdout.fileno(), proc.stderr.fileno()
+    bufs = {out_fd: bytearray(), err_fd: bytearray()}
+    out_end = re.compile(rb"\n" + marker + rb" (\d+)\n$")
+    err_end = b"\n" + marker + b"\n"
+    pending = {out_fd, err_fd}
+    deadline = time.monotonic() + timeout
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(command, timeout)
+        ready, _, _ = select.select(list(pending), [], [], remaining)
+        for fd in ready:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise _HelperDied(bufs[err_fd].decode(errors="replace").strip())
+            bufs[fd] += chunk
+            if fd == out_fd and out_end.search(bufs[fd][-64:]):
+                pending.discard(fd)
+            elif fd == err_fd and bufs[fd].endswith(err_end):
+                pending.discard(fd)
+
+    out = bytes(bufs[out_fd])
+    m = out_end.search(out)
+    stdout = out[:m.start()]
+    stderr = bytes(bufs[err_fd][:-len(err_end)])
+    return int(m.group(1)), stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+def _via_helper(command: str, args: list[str], timeout: float):
+    """Run a shell command line in the helper; None when the helper is unavailable."""
+    global _proc, _unavailable_until
+    with _lock:
+        if time.monotonic() < _unavailable_until:
+            return None
+        fresh = _proc is None or _proc.poll() is not None
+        if fresh:
+            _proc = _spawn()
+        try:
+            rc, out, err = _exchange(_proc, command, timeout)
+            return subprocess.CompletedProcess(args, rc, out, err)
+        except subprocess.TimeoutExpired:
+            _kill_running(_proc)  # Start clean next time
+            _proc = None
+            raise subprocess.TimeoutExpired(args, timeout)
+        except _HelperDied as e:
+            _proc.wait()  # Already exited — just reap it
+            _proc = None
+            if not fresh:
+                raise RuntimeError(f"sudo helper exited during '{command}': {e}")
+            logger.debug("Persistent sudo unavailable (%s); using per-call sudo.", e)
+            _unavailable_until = time.monotonic() + _RETRY_AFTER
+            return None
+
+
+def sudo_run(argv: list[str], timeout: float = 10, check: bool = False) -> subprocess.CompletedProcess:
+    """
+    Text-mode equivalent of subprocess.run(["sudo", *argv], capture_output=True, text=True, ...)
+    that reuses the persistent helper when passwordless sudo is available.
+    """
+    result = _via_helper(shlex.join(argv), ["sudo", *argv], timeout)
+    if result is None:
+        # Same session: plain sudo may need the terminal to prompt for a password
+        result = tracked_run(["sudo", *argv], capture_output=True, text=True, timeout=timeout, start_new_session=False)
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+    return result
+
+
+def sudo_pipe(argv: list[str], filter_argv: list[str], timeout: float = 10) -> subprocess.CompletedProcess:
+    """
+    `sudo argv | filter_argv` in text mode, without a shell on the fallback path. Through the helper the
+    whole pipeline runs as root and only the filtered output comes back; otherwise `sudo argv` is piped
+    into an unprivileged filter process. The return code is the first non-zero one, as with pipefail.
+    """
+    args = ["sudo", *argv, "|", *filter_argv]
+    result = _via_helper(f"set -o pipefail; {shlex.join(argv)} | {shlex.join(filter_argv)}", args, timeout)
+    if result is not None:
+        return result
+
+    deadline = time.monotonic() + timeout
+    # Same session: plain sudo may need the terminal to prompt for a password
+    with subprocess.Popen(["sudo", *argv], stdout=subprocess.PIPE, stderr=subprocess.PIPE) as src:
+        try:
+            filt = subprocess.Popen(filter_argv, stdin=src.stdout, stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, text=True)
+        except OSError:
+            src.terminate()  # sudo relays SIGTERM to its child; SIGKILL would orphan it
+            raise
+        finally:
+            src.stdout.close()  # The filter now holds the only read end
+        with filt:
+            try:
+                out, err = filt.communicate(timeout=timeout)
+                src_err = src.stderr.read().decode(errors="replace")
+                src.wait(timeout=max(0.1, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                src.terminate()
+                filt.kill()
+                raise subprocess.TimeoutExpired(args, timeout)
+    rc = src.returncode or filt.returncode
+    return subprocess.CompletedProcess(args, rc, out, src_err + err)
@@ -6,10 +6,42 @@ Enables Max to learn, adapt, and develop code autonomously.
 """
 
 import os
+import shutil
 import subprocess
 import re
+import threading
+from functools import lru_cache
 
 from skills import skill
+from skills.file_ops import note_write
+
+_SYSTEMCTL = shutil.which("systemctl") or "/usr/bin/systemctl"
+_TB_FRAME_RE = re.compile(r'File "([^"]+)", line (\d+)')
+_OLLAMA_MODEL_RE = re.compile(r'ollama_model:\s*str\s*=\s*"[^"]+"')
+
+
+@lru_cache(maxsize=256)
+def _expand(path: str) -> str:
+    """Cached os.path.expanduser — $HOME doesn't change for the life of the process."""
+    return os.path.expanduser(path)
+
+
+def _restart_service(delay: float = 0.0):
+    """Restart jarvis.service in its own session, optionally after a delay."""
+    def _spawn():
+        subprocess.Popen(
+            [_SYSTEMCTL, "--user", "restart", "jarvis.service"],
+            start_new_session=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    if delay <= 0:
+        _spawn()
+        return
+    timer = threading.Timer(delay, _spawn)
+    timer.daemon = True
+    timer.start()
 
 
 # ── Code Writing & Editing ───────────────────────────────────
@@ -38,10 +70,11 @@ from skills import skill
 )
 def write_code(filepath: str, content: str, **kwargs) -> str:
     try:
-        filepath = os.path.expanduser(filepath)
+        filepath = _expand(filepath)
         os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
-        with open(filepath, "w") as f:
-            f.write(content)
+        with open(filepath, "wb") as f:
+            f.write(content.encode("utf-8"))
+        note_write(filepath)
         return f"Written {len(content)} chars to {filepath}"
     except Exception as e:
         return f"Error writing file: {e}"
@@ -74,17 +107,26 @@ def write_code(filepath: str, content: str, **kwargs) -> str:
 )
 def edit_file(filepath: str, find: str, replace: str, **kwargs) -> str:
     try:
-        filepath = os.path.expanduser(filepath)
-        with open(filepath, "r") as f:
+        filepath = _expand(filepath)
+        # Work in bytes: UTF-8 is self-synchronizing, so byte-level find/count/replace
+        # is safe without a decode round trip. Bytes don't get universal newlines, though,
+        # so in a CRLF file put find/replace in the file's own line endings first.
+        with open(filepath, "rb") as f:
             content = f.read()
 
-        if find not in content:
+        find_b = find.encode("utf-8")
+        replace_b = replace.encode("utf-8")
+        if b"\r\n" in content:
+            find_b = find_b.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+            replace_b = replace_b.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+        if find_b not in content:
             return f"Target text not found in {filepath}."
 
-        count = content.count(find)
-        new_content = content.replace(find, replace)
-        with open(filepath, "w") as f:
+        count = content.count(find_b)
+        new_content = content.replace(find_b, replace_b)
+        with open(filepath, "wb") as f:
             f.write(new_content)
+        note_write(filepath)
         return f"Replaced {count} occurrence(s) in {filepath}."
     except Exception as e:
         return f"Error editing file: {e}"
@@ -110,9 +152,10 @@ def edit_file(filepath: str, find: str, replace: str, **kwargs) -> str:
 )
 def append_to_file(filepath: str, content: str, **kwargs) -> str:
     try:
-        filepath = os.path.expanduser(filepath)
-        with open(filepath, "a") as f:
-            f.write(content)
+        filepath = _expand(filepath)
+        with open(filepath, "ab") as f:
+            f.write(content.encode("utf-8"))
+        note_write(filepath)
         return f"Appended {len(content)} chars to {filepath}."
     except Exception as e:
         return f"Error appending to file: {e}"
@@ -160,14 +203,13 @@ def pull_ollama_model(model_name: str, **kwargs) -> str:
 )
 def switch_active_model(model_name: str, **kwargs) -> str:
     try:
-        config_path = os.path.expanduser("~/.gemini/antigravity/scratch/jarvis/config.py")
+        config_path = _expand("~/.gemini/antigravity/scratch/jarvis/config.py")
         with open(config_path, "r") as f:
             content = f.read()
             
         # Regex replace the ollama_model line
-        new_content = re.sub(
-            r'ollama_model:\s*str\s*=\s*"[^"]+"', 
-            f'ollama_model: str = "{model_name}"', 
+        new_content = _OLLAMA_MODEL_RE.sub(
+            f'ollama_model: str = "{model_name}"',
             content
         )
         
@@ -175,7 +217,7 @@ def switch_active_model(model_name: str, **kwargs) -> str:
             f.write(new_content)
             
         # Restart the brain
-        subprocess.Popen(["systemctl", "--user", "restart", "jarvis.service"])
+        _restart_service()
         return f"Model switched to {model_name}. Core is restarting..."
     except Exception as e:
         return f"Error switching active model: {e}"
@@ -207,7 +249,7 @@ def switch_active_model(model_name: str, **kwargs) -> str:
 )
 def read_code(filepath: str, start_line: int = 1, end_line: int = 0, **kwargs) -> str:
     try:
-        filepath = os.path.expanduser(filepath)
+        filepath = _expand(filepath)
         with open(filepath, "r") as f:
             lines = f.readlines()
 
@@ -250,20 +292,28 @@ def read_code(filepath: str, start_line: int = 1, end_line: int = 0, **kwargs) -
 )
 def grep_code(pattern: str, path: str = ".", file_type: str = "", **kwargs) -> str:
     try:
-        path = os.path.expanduser(path)
+        path = _expand(path)
         cmd = ["grep", "-rn", "--color=never"]
         if file_type:
             cmd.extend(["--include", f"*.{file_type}"])
         cmd.extend([pattern, path])
 
         result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=15,
+            cmd, capture_output=True, timeout=15,
         )
-        output = result.stdout.strip()
-        lines = output.split("\n")
-        if len(lines) > 50:
-            return "\n".join(lines[:50]) + f"\n... ({len(lines)} total matches, showing 50)"
-        return output if output else f"No matches for '{pattern}' in {path}."
+        # Keep stdout as bytes: count matches on the raw buffer and decode only
+        # the 50 lines we actually return.
+        raw = result.stdout.strip()
+        if not raw:
+            return f"No matches for '{pattern}' in {path}."
+        total = raw.count(b"\n") + 1
+        if total > 50:
+            end = -1
+            for _ in range(50):
+                end = raw.find(b"\n", end + 1)
+            shown = raw[:end].decode("utf-8", "replace")
+            return shown + f"\n... ({total} total matches, showing 50)"
+        return raw.decode("utf-8", "replace")
     except Exception as e:
         return f"Error searching: {e}"
 
@@ -294,7 +344,7 @@ def grep_code(pattern: str, path: str = ".", file_type: str = "", **kwargs) -> s
 def run_python(code: str = "", filepath: str = "", timeout: int = 30, **kwargs) -> str:
     try:
         if filepath:
-            filepath = os.path.expanduser(filepath)
+            filepath = _expand(filepath)
             cmd = ["python3", filepath]
         elif code:
             cmd = ["python3", "-c", code]
@@ -335,7 +385,7 @@ def run_python(code: str = "", filepath: str = "", timeout: int = 30, **kwargs)
 )
 def run_tests(path: str = ".", framework: str = "pytest", **kwargs) -> str:
     try:
-        path = os.path.expanduser(path)
+        path = _expand(path)
         if framework == "pytest":
             cmd = ["python3", "-m", "pytest", "-v", "--tb=short", path]
         else:
@@ -373,7 +423,7 @@ def git_status(path: str = ".", **kwargs) -> str:
     try:
         result = subprocess.run(
             ["git", "status", "--short", "--branch"],
-            cwd=os.path.expanduser(path),
+            cwd=_expand(path),
             capture_output=True, text=True, timeout=10,
         )
         return result.stdout.strip() or "Clean working tree."
@@ -401,7 +451,7 @@ def git_status(path: str = ".", **kwargs) -> str:
 )
 def git_commit(message: str, path: str = ".", **kwargs) -> str:
     try:
-        cwd = os.path.expanduser(path)
+        cwd = _expand(path)
         subprocess.run(["git", "add", "-A"], cwd=cwd, check=True, capture_output=True, timeout=10)
         result = subprocess.run(
             ["git", "commit", "-m", message],
@@ -429,7 +479,7 @@ def git_diff(path: str = ".", **kwargs) -> str:
     try:
         result = subprocess.run(
             ["git", "diff", "--stat"],
-            cwd=os.path.expanduser(path),
+            cwd=_expand(path),
             capture_output=True, text=True, timeout=10,
         )
         output = result.stdout.strip()
@@ -461,7 +511,7 @@ def git_log(count: int = 10, path: str = ".", **kwargs) -> str:
     try:
         result = subprocess.run(
             ["git", "log", f"-{count}", "--oneline", "--graph"],
-            cwd=os.path.expanduser(path),
+            cwd=_expand(path),
             capture_output=True, text=True, timeout=10,
         )
         return result.stdout.strip() or "No commits yet."
@@ -502,6 +552,7 @@ def add_skill(module_name: str, code: str, **kwargs) -> str:
 
         with open(filepath, "w") as f:
             f.write(code)
+        note_write(filepath)
 
         return (
             f"New skill module created: {filepath}\n"
@@ -536,10 +587,13 @@ def learn_from_error(error: str, filepath: str = "", **kwargs) -> str:
     info = [f"Error analysis:\n{error}\n"]
 
     # Extract file and line from traceback
-    import re
-    matches = re.findall(r'File "([^"]+)", line (\d+)', error)
+    matches = _TB_FRAME_RE.findall(error)
     if matches:
+        seen = set()
         for fpath, line_no in matches[-3:]:  # Last 3 frames
+            if (fpath, line_no) in seen:  # Recursion repeats frames
+                continue
+            seen.add((fpath, line_no))
             if os.path.exists(fpath):
                 try:
                     with open(fpath, "r") as f:
@@ -587,12 +641,7 @@ def learn_from_error(error: str, filepath: str = "", **kwargs) -> str:
 def upgrade_max_core(reason: str, **kwargs) -> str:
     try:
         # We run the restart in the background slightly delayed so we can return the response first
-        import subprocess
-        subprocess.Popen(
-            "sleep 2 && systemctl --user restart jarvis.service",
-            shell=True,
-            start_new_session=True
-        )
+        _restart_service(delay=2.0)
         return f"Initiating core upgrade/restart sequence in 2 seconds. Reason: {reason}"
     except Exception as e:
         return f"Failed to initiate upgrade sequence: {e}"
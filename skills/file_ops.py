@@ -4,18 +4,175 @@ Jarvis Skills — File Operations
 Provides skills for searching, reading, creating, and managing files.
 """
 
+import datetime
+import fnmatch
+import heapq
+import mmap
 import os
-import subprocess
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from skills import skill
 
+_SIZE_UNITS = ("B", "KB", "MB", "GB")
+_fromtimestamp = datetime.datetime.fromtimestamp
+
+
+def _fmt_size(size: int, precision: int = 1, byte_unit: str = "B") -> str:
+    """Human-readable size; bit_length() picks the unit instead of an if/elif ladder."""
+    idx = min((size.bit_length() - 1) // 10, 3) if size > 0 else 0
+    if not idx:
+        return f"{size} {byte_unit}"
+    return f"{size / (1 << (10 * idx)):.{precision}f} {_SIZE_UNITS[idx]}"
+
 
 # ── Search Files ─────────────────────────────────────────────
 
+_SEARCH_MAX_DEPTH = 5
+_SEARCH_TIMEOUT = 10.0
+
+
+@lru_cache(maxsize=128)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a search pattern to a case-insensitive name matcher (like find -iname)."""
+    glob = pattern if "*" in pattern or "?" in pattern else f"*{pattern}*"
+    return re.compile(fnmatch.translate(glob), re.IGNORECASE)
+
+
+def _iter_files(root: str, deadline: float):
+    """
+    Breadth-first scandir walk mirroring `find -maxdepth 5 -not -path '*/.*' -type f`.
+    Yields (name, path) per file; raises TimeoutError once `deadline` passes.
+    """
+    queue = deque([(root, 0)])
+    while queue:
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        current, depth = queue.popleft()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if depth + 1 < _SEARCH_MAX_DEPTH:
+                            queue.append((entry.path, depth + 1))
+                    elif entry.is_file(follow_symlinks=False):
+                        yield name, entry.path
+                except OSError:
+                    continue
+
+
+def _walk_matches(root: str, matcher: re.Pattern, max_results: int, deadline: float) -> tuple[list[str], bool]:
+    """Live search that stops as soon as max_results files match. Returns (matches, timed_out)."""
+    results: list[str] = []
+    try:
+        for name, path in _iter_files(root, deadline):
+            if matcher.match(name):
+                results.append(path)
+                if len(results) >= max_results:
+                    break
+    except TimeoutError:
+        return results, True
+    return results, False
+
+
+# ── Home-directory name index ──
+# Literal searches (no glob chars) under ~ are answered from a lowercased
+# name -> paths index built by one background walk and refreshed every 5 min.
+
+_INDEX_TTL = 300.0
+_INDEX_BUILD_TIMEOUT = 120.0
+_INDEX_MAX_FILES = 200_000
+_NAME_INDEX: dict[str, list[str]] | None = None
+_INDEX_TS = -_INDEX_TTL  # monotonic() counts from boot; start stale so the first lookup builds
+_INDEX_LOCK = threading.Lock()
+_INDEX_BUILDING = False
+_INDEX_ADDED: list[str] = []  # Written while a rebuild was walking — merged into its result
+
+
+def _build_name_index(root: str):
+    global _NAME_INDEX, _INDEX_TS, _INDEX_BUILDING
+    index: dict[str, list[str]] = {}
+    try:
+        count = 0
+        for name, path in _iter_files(root, time.monotonic() + _INDEX_BUILD_TIMEOUT):
+            index.setdefault(name.lower(), []).append(path)
+            count += 1
+            if count > _INDEX_MAX_FILES:
+                index = None  # Too big to be worth holding — keep using live walks
+                break
+    except Exception:  # Includes TimeoutError from a walk that ran over budget
+        index = None
+    with _INDEX_LOCK:
+        if index is not None:
+            for path in _INDEX_ADDED:
+                paths = index.setdefault(os.path.basename(path).lower(), [])
+                if path not in paths:
+                    paths.append(path)
+        _INDEX_ADDED.clear()
+        _NAME_INDEX = index
+        _INDEX_TS = time.monotonic()
+        _INDEX_BUILDING = False
+
+
+def _index_add(path: str):
+    """Add a just-written file to the name index, if the index walk would have found it."""
+    path = os.path.abspath(path)
+    rel = os.path.relpath(path, os.path.expanduser("~"))
+    parts = rel.split(os.sep)
+    if parts[0] == ".." or len(parts) > _SEARCH_MAX_DEPTH or any(p.startswith(".") for p in parts):
+        return
+    with _INDEX_LOCK:
+        if _INDEX_BUILDING:
+            _INDEX_ADDED.append(path)
+        if _NAME_INDEX is not None:
+            paths = _NAME_INDEX.setdefault(parts[-1].lower(), [])
+            if path not in paths:
+                paths.append(path)
+
+
+def _index_lookup(pattern: str, max_results: int) -> list[str] | None:
+    """Index answer for a literal pattern, or None if the index is cold/stale (a rebuild is kicked off)."""
+    global _INDEX_BUILDING
+    with _INDEX_LOCK:
+        fresh = time.monotonic() - _INDEX_TS < _INDEX_TTL
+        if not fresh and not _INDEX_BUILDING:
+            _INDEX_BUILDING = True
+            threading.Thread(
+                target=_build_name_index, args=(os.path.expanduser("~"),),
+                daemon=True, name="search-index",
+            ).start()
+        index = _NAME_INDEX if fresh else None
+        if index is None:
+            return None
+
+        # Exact names are a keyed hit; partial names (*pattern*, like -iname) still need a scan
+        needle = pattern.lower()
+        results = list(index.get(needle, ()))
+        if len(results) < max_results:
+            for name, paths in index.items():
+                if needle in name and name != needle:
+                    results.extend(paths)
+                    if len(results) >= max_results:
+                        break
+    return results[:max_results]
+
+
 @skill(
     name="search_files",
-    description="Searches for files by name or pattern in a directory. Uses the 'find' command.",
+    description="Searches for files by name or pattern in a directory (up to 5 levels deep, skipping hidden paths).",
     parameters={
         "type": "object",
         "properties": {
@@ -44,35 +201,101 @@ def search_files(
         return f"Directory not found: {directory}"
 
     try:
-        # Use find with -iname for case-insensitive matching
-        name_pattern = pattern if "*" in pattern else f"*{pattern}*"
-        result = subprocess.run(
-            [
-                "find", directory,
-                "-maxdepth", "5",
-                "-iname", name_pattern,
-                "-not", "-path", "*/.*",
-                "-type", "f",
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-
-        files = [f for f in result.stdout.strip().split("\n") if f][:max_results]
+        files = None
+        if not any(c in pattern for c in "*?[") and os.path.abspath(directory) == os.path.expanduser("~"):
+            files = _index_lookup(pattern, max_results)
+        if files:
+            timed_out = False
+        else:  # Cold index, or no hit — the index may predate the file, so confirm with a live walk
+            files, timed_out = _walk_matches(
+                directory, _compile_pattern(pattern), max_results, time.monotonic() + _SEARCH_TIMEOUT,
+            )
 
         if not files:
+            if timed_out:
+                return "Search timed out. Try a more specific directory."
             return f"No files matching '{pattern}' found in {directory}."
 
         return f"Found {len(files)} file(s):\n" + "\n".join(f"  • {f}" for f in files)
-    except subprocess.TimeoutExpired:
-        return "Search timed out. Try a more specific directory."
     except Exception as e:
         return f"Search failed: {e}"
 
 
 # ── Read File ────────────────────────────────────────────────
 
+_READ_CHUNK = 256 * 1024
+_SMALL_FILE = 64 * 1024
+
+
+def _cut_head(data, max_lines: int, f=None) -> tuple[bytes, bool]:
+    """
+    Slice `data` (bytes, bytearray or mmap) down to its first max_lines lines.
+    `f` is checked for further unread data when `data` holds only part of the file.
+    """
+    end = -1
+    for _ in range(max_lines):
+        end = data.find(b"\n", end + 1)
+        if end == -1:
+            head = data[:-1] if data[-1:] == b"\n" else data[:]
+            return bytes(head), False
+
+    truncated = len(data) > end + 1 or (f is not None and bool(f.read(1)))
+    return bytes(data[:end]), truncated
+
+
+def _open_readonly(path: str, size: int, max_lines: int) -> int:
+    """
+    Open `path` for a one-pass read: O_NOATIME skips the atime inode write, and
+    fadvise asks for aggressive readahead of roughly the bytes we'll need.
+    """
+    noatime = getattr(os, "O_NOATIME", 0)
+    fd = -1
+    if noatime:
+        try:
+            fd = os.open(path, os.O_RDONLY | noatime)
+        except PermissionError:
+            pass  # O_NOATIME is only allowed for the file's owner — retry without it
+    if fd < 0:
+        fd = os.open(path, os.O_RDONLY)
+
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, min(size, max_lines * 256), os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+    return fd
+
+
+def _read_head(f, size: int, max_lines: int) -> tuple[bytes, bool]:
+    """
+    Read just enough of binary file `f` to cover its first max_lines lines.
+    Returns (head without the final newline, truncated).
+    """
+    if size < _SMALL_FILE:
+        return _cut_head(f.read(), max_lines, f)
+
+    # Large files: map them and scan for newlines, so only the pages holding
+    # the requested lines are ever faulted in.
+    try:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            return _cut_head(mm, max_lines)
+    except (OSError, ValueError):
+        pass  # Not mappable (e.g. some FUSE mounts) — fall back to chunked reads
+
+    data = bytearray()
+    newlines = 0
+    while newlines < max_lines:
+        chunk = f.read(_READ_CHUNK)
+        if not chunk:
+            break
+        newlines += chunk.count(b"\n")
+        data += chunk
+    return _cut_head(data, max_lines, f)
+
+
 @skill(
     name="read_file",
     description="Reads and returns the contents of a text file. Limited to first 500 lines for safety.",
@@ -105,18 +328,20 @@ def read_file(path: str, max_lines: int = 100, **kwargs) -> str:
     if size > 5 * 1024 * 1024:  # 5 MB
         return f"File too large ({size / (1024*1024):.1f} MB). Maximum is 5 MB."
 
-    max_lines = min(max_lines, 500)
+    max_lines = max(1, min(max_lines, 500))
 
     try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            lines = []
-            for i, line in enumerate(f):
-                if i >= max_lines:
-                    lines.append(f"\n... (truncated at {max_lines} lines, file has more)")
-                    break
-                lines.append(line.rstrip())
+        with open(_open_readonly(path, size, max_lines), "rb", buffering=0) as f:
+            head, truncated = _read_head(f, size, max_lines)
+
+        # The head is already newline-joined; only CRLF endings need normalising
+        text = head.decode("utf-8", "replace").replace("\r\n", "\n")
+        if text.endswith("\r"):
+            text = text[:-1]
+        if truncated:
+            text += f"\n\n... (truncated at {max_lines} lines, file has more)"
 
-        return "\n".join(lines)
+        return text
     except PermissionError:
         return f"Permission denied: {path}"
     except Exception as e:
@@ -150,16 +375,28 @@ def read_file(path: str, max_lines: int = 100, **kwargs) -> str:
 def create_file(path: str, content: str, force: bool = False, **kwargs) -> str:
     path = os.path.expanduser(path.strip())
 
-    if os.path.exists(path) and not force:
-        return (
-            f"File already exists: {path}. "
-            "Use force=true to overwrite."
-        )
+    # O_EXCL folds the "already exists" check into the open itself (no stat, no race)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | (0 if force else os.O_EXCL)
 
     try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        parent = os.path.dirname(path)
+        if parent and not os.path.isdir(parent):
+            os.makedirs(parent, exist_ok=True)
+        try:
+            fd = os.open(path, flags, 0o666)
+        except FileExistsError:
+            return (
+                f"File already exists: {path}. "
+                "Use force=true to overwrite."
+            )
+        # Encode once and hand the kernel the whole buffer (looping on short writes)
+        view = memoryview(content.encode("utf-8"))
+        try:
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        note_write(path)
         return f"File created: {path} ({len(content)} characters)"
     except PermissionError:
         return f"Permission denied: cannot write to {path}"
@@ -169,6 +406,79 @@ def create_file(path: str, content: str, force: bool = False, **kwargs) -> str:
 
 # ── List Directory ───────────────────────────────────────────
 
+_LIST_LIMIT = 50
+_LIST_CACHE_TTL = 60.0
+_LIST_CACHE_MAX = 32
+# (abspath, show_hidden) -> (timestamp, dir mtime_ns, formatted listing)
+_LIST_CACHE: "OrderedDict[tuple[str, bool], tuple[float, int, str]]" = OrderedDict()
+_LIST_CACHE_LOCK = threading.Lock()  # Skills can run on the self-heal thread alongside the main loop
+
+
+def _invalidate_listing(directory: str):
+    """
+    Drop cached listings of `directory` (both hidden and non-hidden variants). Skills that write
+    files call note_write, which calls this: rewriting an existing file changes its size in the listing
+    but not the directory's mtime, so the mtime check alone won't catch it.
+    """
+    directory = os.path.abspath(directory or ".")
+    with _LIST_CACHE_LOCK:
+        for show_hidden in (False, True):
+            _LIST_CACHE.pop((directory, show_hidden), None)
+
+
+def note_write(path: str):
+    """
+    Keep cached listings and the name index current after a skill writes `path`. Called by create_file,
+    dev_ops (write_code, edit_file, append_to_file, add_skill) and online_ops.download_file. Files that
+    shell commands write (run_command) aren't reported: listings catch those through the directory
+    mtime check, the index on its next rebuild.
+    """
+    _invalidate_listing(os.path.dirname(path))
+    _index_add(path)
+
+
+_REMOTE_FS_TYPES = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "davfs", "sshfs"}
+_POOL_MIN_ENTRIES = 16
+_STAT_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="list-stat")
+
+
+_REMOTE_BY_DEV: dict[int, bool] = {}
+
+
+def _is_remote_fs(st_dev: int, path: str) -> bool:
+    """True if `path` lives on a network/FUSE mount where each stat is a round trip. Cached per device."""
+    if st_dev in _REMOTE_BY_DEV:
+        return _REMOTE_BY_DEV[st_dev]
+    best, fstype = "", ""
+    try:
+        with open("/proc/self/mounts") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mnt = parts[1].replace("\\040", " ")
+                if (path == mnt or path.startswith(mnt.rstrip("/") + "/")) and len(mnt) >= len(best):
+                    best, fstype = mnt, parts[2]
+    except OSError:
+        pass
+    remote = fstype in _REMOTE_FS_TYPES or fstype.startswith("fuse")
+    _REMOTE_BY_DEV[st_dev] = remote
+    return remote
+
+
+def _format_entry(entry: os.DirEntry) -> str:
+    """One listing line for a DirEntry."""
+    # is_dir() is answered from d_type and stat() is cached on the entry, so this
+    # is at most one syscall per entry (only symlinks need one for is_dir).
+    try:
+        if entry.is_dir():
+            return "  📁 " + entry.name + "/"
+        size = entry.stat().st_size
+    except OSError:
+        return "  📄 " + entry.name
+    return "  📄 " + entry.name + " (" + _fmt_size(size) + ")"
+
+
 @skill(
     name="list_directory",
     description="Lists files and subdirectories in a directory, with sizes.",
@@ -189,36 +499,47 @@ def create_file(path: str, content: str, force: bool = False, **kwargs) -> str:
 def list_directory(path: str = "", show_hidden: bool = False, **kwargs) -> str:
     path = os.path.expanduser(path.strip()) if path.strip() else os.path.expanduser("~")
 
-    if not os.path.isdir(path):
-        return f"Not a directory: {path}"
-
     try:
-        entries = sorted(os.listdir(path))
-        if not show_hidden:
-            entries = [e for e in entries if not e.startswith(".")]
-
-        lines = [f"Contents of {path}:"]
-        for entry in entries[:50]:  # Limit to 50 entries
-            full_path = os.path.join(path, entry)
-            if os.path.isdir(full_path):
-                lines.append(f"  📁 {entry}/")
-            else:
-                try:
-                    size = os.path.getsize(full_path)
-                    if size >= 1024 * 1024:
-                        size_str = f"{size / (1024 * 1024):.1f} MB"
-                    elif size >= 1024:
-                        size_str = f"{size / 1024:.1f} KB"
-                    else:
-                        size_str = f"{size} B"
-                    lines.append(f"  📄 {entry} ({size_str})")
-                except OSError:
-                    lines.append(f"  📄 {entry}")
+        dir_st = os.stat(path)
+    except OSError:
+        return f"Not a directory: {path}"
+    if not stat.S_ISDIR(dir_st.st_mode):
+        return f"Not a directory: {path}"
 
-        if len(entries) > 50:
-            lines.append(f"  ... and {len(entries) - 50} more entries")
+    # Repeat listings of the same folder within the TTL skip the listdir + stat pass,
+    # as long as the directory itself hasn't changed (mtime bumps on add/remove/rename).
+    key = (os.path.abspath(path), show_hidden)
+    with _LIST_CACHE_LOCK:
+        cached = _LIST_CACHE.get(key)
+        if cached and time.monotonic() - cached[0] < _LIST_CACHE_TTL and cached[1] == dir_st.st_mtime_ns:
+            _LIST_CACHE.move_to_end(key)
+            return cached[2]
 
-        return "\n".join(lines)
+    try:
+        with os.scandir(path) as it:
+            visible = [e for e in it if show_hidden or not e.name.startswith(".")]
+        # Only the first 50 names are shown: select them in O(n log 50) instead of sorting all
+        entries = heapq.nsmallest(_LIST_LIMIT, visible, key=lambda e: e.name)
+
+        more = len(visible) - _LIST_LIMIT
+        lines = [""] * (len(entries) + 1 + (more > 0))
+        lines[0] = f"Contents of {path}:"
+        if len(entries) >= _POOL_MIN_ENTRIES and _is_remote_fs(dir_st.st_dev, os.path.realpath(path)):
+            # Network mounts: keep several stat round trips in flight at once
+            lines[1:len(entries) + 1] = _STAT_POOL.map(_format_entry, entries)
+        else:
+            for i, entry in enumerate(entries, 1):
+                lines[i] = _format_entry(entry)
+        if more > 0:
+            lines[-1] = f"  ... and {more} more entries"
+
+        output = "\n".join(lines)
+        with _LIST_CACHE_LOCK:
+            _LIST_CACHE[key] = (time.monotonic(), dir_st.st_mtime_ns, output)
+            _LIST_CACHE.move_to_end(key)
+            if len(_LIST_CACHE) > _LIST_CACHE_MAX:
+                _LIST_CACHE.popitem(last=False)
+        return output
     except PermissionError:
         return f"Permission denied: {path}"
     except Exception as e:
@@ -242,29 +563,24 @@ def list_directory(path: str = "", show_hidden: bool = False, **kwargs) -> str:
     },
 )
 def get_file_info(path: str, **kwargs) -> str:
-    import datetime
-    import stat
-
     path = os.path.expanduser(path.strip())
 
-    if not os.path.exists(path):
-        return f"Path not found: {path}"
-
     try:
-        st = os.stat(path)
-        file_type = "directory" if os.path.isdir(path) else "file"
+        # One lstat answers existence, type, size, mtime and mode
+        try:
+            st = os.stat(path, follow_symlinks=False)
+        except FileNotFoundError:
+            return f"Path not found: {path}"
+        if stat.S_ISDIR(st.st_mode):
+            file_type = "directory"
+        elif stat.S_ISLNK(st.st_mode):
+            file_type = "symlink"
+        else:
+            file_type = "file"
         size = st.st_size
-        modified = datetime.datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+        modified = _fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
         permissions = stat.filemode(st.st_mode)
-
-        if size >= 1024 * 1024 * 1024:
-            size_str = f"{size / (1024**3):.2f} GB"
-        elif size >= 1024 * 1024:
-            size_str = f"{size / (1024**2):.2f} MB"
-        elif size >= 1024:
-            size_str = f"{size / 1024:.2f} KB"
-        else:
-            size_str = f"{size} bytes"
+        size_str = _fmt_size(size, precision=2, byte_unit="bytes")
 
         return (
             f"Path: {path}\n"
@@ -6,25 +6,199 @@ storage mount/unmount, Bluetooth pairing, keyboard backlight, touchpad, fan cont
 network scanning, and more.
 """
 
+import asyncio
+import atexit
+import functools
 import logging
 import os
+import pty
+import queue
+import re
+import shutil
 import subprocess
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from skills import skill
 
+try:
+    import pyperclip  # Optional: uses whichever of xclip/xsel/wl-clipboard is installed (still a subprocess on Linux)
+except ImportError:
+    pyperclip = None
+
 logger = logging.getLogger("jarvis.skills.hardware_control")
 
 
+# ── Short-lived result cache ─────────────────────────────────
+
+def _ttl_cache(seconds: float):
+    """
+    Memoize a no-argument skill's result for `seconds` (info that rarely changes between LLM calls).
+    "Error: ..." results are not cached, so a transient failure is retried on the next call.
+    """
+    def decorator(func):
+        state = {"value": None, "expires": 0.0}
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            now = time.monotonic()
+            if state["value"] is not None and now < state["expires"]:
+                return state["value"]
+            value = func(**kwargs)
+            if not str(value).startswith("Error"):
+                state.update(value=value, expires=now + seconds)
+            return value
+
+        wrapper.cache_clear = lambda: state.update(value=None, expires=0.0)
+        return wrapper
+    return decorator
+
+
+# ── Tool availability ────────────────────────────────────────
+
+@functools.lru_cache(maxsize=64)
+def _have(cmd: str) -> bool:
+    """Whether `cmd` is on PATH — checked once, so absent tools are never forked just to fail."""
+    return shutil.which(cmd) is not None
+
+
+# ── Concurrent probes ────────────────────────────────────────
+
+async def _aexec(cmd: list[str], timeout: float = 5) -> subprocess.CompletedProcess:
+    """asyncio counterpart of subprocess.run(cmd, capture_output=True, text=True, timeout=...)."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except asyncio.CancelledError:
+        proc.kill()  # Don't leave a cancelled probe running in the background
+        await proc.wait()
+        raise
+    return subprocess.CompletedProcess(
+        cmd, proc.returncode, out.decode(errors="replace"), err.decode(errors="replace"),
+    )
+
+
+def _run_concurrently(*cmds: list[str], timeout: float = 5) -> list:
+    """
+    Run independent commands at once so wall time is the slowest probe, not the sum.
+    Returns a CompletedProcess or the raised exception for each command, in order.
+    """
+    async def _all():
+        return await asyncio.gather(*(_aexec(c, timeout) for c in cmds), return_exceptions=True)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_all())
+
+    # Called from inside an event loop, where asyncio.run() can't nest — use threads
+    with ThreadPoolExecutor(max_workers=len(cmds)) as pool:
+        futures = [
+            pool.submit(subprocess.run, c, capture_output=True, text=True, timeout=timeout)
+            for c in cmds
+        ]
+        results = []
+        for fut in futures:
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+def _run_until(cmds: dict[str, list[str]], enough, timeout: float = 5) -> dict:
+    """
+    Like _run_concurrently, but stop as soon as `enough(results)` is true and
+    cancel whatever is still running. Returns {name: CompletedProcess | exception}
+    for the probes that finished; skipped probes are absent.
+    """
+    if not cmds:
+        return {}
+
+    async def _all():
+        tasks = {asyncio.ensure_future(_aexec(c, timeout)): name for name, c in cmds.items()}
+        results = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    results[tasks[t]] = t.exception() or t.result()
+                if enough(results):
+                    break
+        finally:
+            for t in pending:
+                t.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        return results
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_all())
+
+    # Inside an event loop — threads can't kill their probe, so just stop waiting on it
+    pool = ThreadPoolExecutor(max_workers=len(cmds))
+    futures = {
+        pool.submit(subprocess.run, c, capture_output=True, text=True, timeout=timeout): name
+        for name, c in cmds.items()
+    }
+    results = {}
+    try:
+        for fut in as_completed(futures):
+            try:
+                results[futures[fut]] = fut.result()
+            except Exception as e:
+                results[futures[fut]] = e
+            if enough(results):
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
 # ═══════════════════════════════════════════════════════════════
 #  DISPLAY / MONITOR CONTROL
 # ═══════════════════════════════════════════════════════════════
 
+# One pass over the whole buffer instead of splitting into lines and scanning each
+_CONNECTED_RE = re.compile(rb"^(\S+) connected", re.MULTILINE)  # bytes: xrandr output is never decoded
+_GPU_LINE_RE = re.compile(r"^.*(?:VGA|3D|Display).*$", re.MULTILINE)
+_FAN_LINE_RE = re.compile(r"^.*(?:(?i:fan)|RPM).*$", re.MULTILINE)
+
+_OUTPUT_TTL = 5.0
+_output_cache = {"name": None, "ts": 0.0}
+
+
+def _detect_primary_output() -> str:
+    """First connected xrandr output, cached for a few seconds. Raises if xrandr can't run."""
+    if _output_cache["name"] is not None and time.monotonic() - _output_cache["ts"] < _OUTPUT_TTL:
+        return _output_cache["name"]
+    r = subprocess.run(["xrandr", "--current"], capture_output=True, timeout=5)
+    m = _CONNECTED_RE.search(r.stdout)
+    output = m.group(1).decode() if m else ""
+    _output_cache.update(name=output, ts=time.monotonic())
+    return output
+
+
 @skill(
     name="get_display_info",
     description="Gets detailed display/monitor information: resolution, refresh rate, connected monitors.",
     parameters={"type": "object", "properties": {}},
 )
+@_ttl_cache(seconds=10)
 def get_display_info(**kwargs) -> str:
+    if not _have("xrandr"):
+        return "xrandr not found."
     try:
         result = subprocess.run(["xrandr", "--current"], capture_output=True, text=True, timeout=5)
         return f"Display Info:\n{result.stdout}"
@@ -49,15 +223,12 @@ def get_display_info(**kwargs) -> str:
 def set_display_resolution(resolution: str, output: str = "", **kwargs) -> str:
     if not output:
         try:
-            r = subprocess.run(["xrandr", "--current"], capture_output=True, text=True, timeout=5)
-            for line in r.stdout.split("\n"):
-                if " connected" in line:
-                    output = line.split()[0]
-                    break
+            output = _detect_primary_output()
         except Exception:
             return "Cannot detect display output."
     try:
         subprocess.run(["xrandr", "--output", output, "--mode", resolution], check=True, capture_output=True, timeout=5)
+        get_display_info.cache_clear()
         return f"Set {output} to {resolution}."
     except subprocess.CalledProcessError as e:
         return f"Failed: {e.stderr}"
@@ -82,15 +253,13 @@ def set_display_rotation(direction: str, output: str = "", **kwargs) -> str:
         return "Direction must be 'normal', 'left', 'right', or 'inverted'."
     if not output:
         try:
-            r = subprocess.run(["xrandr", "--current"], capture_output=True, text=True, timeout=5)
-            for line in r.stdout.split("\n"):
-                if " connected" in line:
-                    output = line.split()[0]
-                    break
+            output = _detect_primary_output()
         except Exception:
             return "Cannot detect display."
     try:
         subprocess.run(["xrandr", "--output", output, "--rotate", direction], check=True, capture_output=True, timeout=5)
+        _output_cache["ts"] = 0.0
+        get_display_info.cache_clear()
         return f"Rotated {output} to '{direction}'."
     except Exception as e:
         return f"Error: {e}"
@@ -106,17 +275,19 @@ def set_display_rotation(direction: str, output: str = "", **kwargs) -> str:
     parameters={"type": "object", "properties": {}},
 )
 def list_audio_devices(**kwargs) -> str:
+    sinks, sources = _run_concurrently(
+        ["pactl", "list", "sinks", "short"],
+        ["pactl", "list", "sources", "short"],
+    )
     parts = []
-    try:
-        r = subprocess.run(["pactl", "list", "sinks", "short"], capture_output=True, text=True, timeout=5)
-        parts.append(f"Output Devices (Sinks):\n{r.stdout}")
-    except Exception:
+    if isinstance(sinks, Exception):
         parts.append("Cannot list output devices.")
-    try:
-        r = subprocess.run(["pactl", "list", "sources", "short"], capture_output=True, text=True, timeout=5)
-        parts.append(f"Input Devices (Sources):\n{r.stdout}")
-    except Exception:
+    else:
+        parts.append(f"Output Devices (Sinks):\n{sinks.stdout}")
+    if isinstance(sources, Exception):
         parts.append("Cannot list input devices.")
+    else:
+        parts.append(f"Input Devices (Sources):\n{sources.stdout}")
     return "\n".join(parts)
 
 
@@ -194,40 +365,44 @@ def toggle_mute(target: str = "output", mute: bool = None, **kwargs) -> str:
     parameters={"type": "object", "properties": {}},
 )
 def get_gpu_info(**kwargs) -> str:
+    # lspci, nvidia-smi, intel_gpu_frequency and glxinfo are independent — probe them together,
+    # and stop once lspci plus any one detail probe has answered (glxinfo's GL init is the slow one)
+    def _ok(r):
+        return r is not None and not isinstance(r, Exception) and r.returncode == 0 and r.stdout.strip()
+
+    def _enough(res):
+        return "lspci" in res and any(_ok(res.get(k)) for k in ("nvidia", "intel", "glx"))
+
+    probes = {
+        "lspci": ["lspci"],
+        "nvidia": ["nvidia-smi", "--query-gpu=name,memory.total,memory.used,utilization.gpu,temperature.gpu",
+                   "--format=csv,noheader,nounits"],
+        "intel": ["sudo", "intel_gpu_frequency", "-g"],
+        "glx": ["glxinfo", "-B"],
+    }
+    res = _run_until(
+        {k: c for k, c in probes.items() if _have(c[1] if c[0] == "sudo" else c[0])}, _enough,
+    )
+    lspci, nvidia, intel, glx = (res.get(k) for k in ("lspci", "nvidia", "intel", "glx"))
+
     parts = []
-    # Try lspci for GPU identification
-    try:
-        r = subprocess.run(["lspci"], capture_output=True, text=True, timeout=5)
-        gpus = [line for line in r.stdout.split("\n") if "VGA" in line or "3D" in line or "Display" in line]
+    # lspci for GPU identification
+    if lspci is not None and not isinstance(lspci, Exception):
+        gpus = _GPU_LINE_RE.findall(lspci.stdout)
         if gpus:
             parts.append("GPU Hardware:\n" + "\n".join(f"  {g}" for g in gpus))
-    except Exception:
-        pass
 
-    # Try nvidia-smi for NVIDIA GPUs
-    try:
-        r = subprocess.run(["nvidia-smi", "--query-gpu=name,memory.total,memory.used,utilization.gpu,temperature.gpu",
-                           "--format=csv,noheader,nounits"], capture_output=True, text=True, timeout=5)
-        if r.returncode == 0 and r.stdout.strip():
-            parts.append(f"NVIDIA GPU:\n  {r.stdout.strip()}")
-    except FileNotFoundError:
-        pass
+    # nvidia-smi for NVIDIA GPUs
+    if _ok(nvidia):
+        parts.append(f"NVIDIA GPU:\n  {nvidia.stdout.strip()}")
 
-    # Try intel_gpu_top info
-    try:
-        r = subprocess.run(["sudo", "intel_gpu_frequency", "-g"], capture_output=True, text=True, timeout=5)
-        if r.returncode == 0:
-            parts.append(f"Intel GPU Frequency:\n  {r.stdout.strip()}")
-    except FileNotFoundError:
-        pass
+    # intel_gpu_top info
+    if _ok(intel):
+        parts.append(f"Intel GPU Frequency:\n  {intel.stdout.strip()}")
 
-    # Try glxinfo for OpenGL
-    try:
-        r = subprocess.run(["glxinfo", "-B"], capture_output=True, text=True, timeout=5)
-        if r.returncode == 0:
-            parts.append(f"OpenGL Info:\n{r.stdout}")
-    except FileNotFoundError:
-        pass
+    # glxinfo for OpenGL
+    if _ok(glx):
+        parts.append(f"OpenGL Info:\n{glx.stdout}")
 
     return "\n".join(parts) if parts else "No GPU information available."
 
@@ -236,6 +411,30 @@ def get_gpu_info(**kwargs) -> str:
 #  CPU GOVERNOR / FREQUENCY CONTROL
 # ═══════════════════════════════════════════════════════════════
 
+_CPUFREQ = "/sys/devices/system/cpu/cpu0/cpufreq/"
+_CPU_COUNT = os.cpu_count() or 1
+
+
+def _read_sysfs(path: str) -> str:
+    """Read a small sysfs/procfs file directly (no `cat` fork)."""
+    with open(path) as f:
+        return f.read().strip()
+
+
+def _sudo_write(value, *paths: str, timeout: float = 5):
+    """Write `value` to root-owned sysfs/procfs files via one `sudo tee` — no bash layer."""
+    subprocess.run(
+        ["sudo", "tee", *paths], input=f"{value}\n",
+        check=True, capture_output=True, text=True, timeout=timeout,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _available_governors() -> str:
+    """The governor list is fixed by the cpufreq driver, so read it once."""
+    return _read_sysfs(_CPUFREQ + "scaling_available_governors")
+
+
 @skill(
     name="get_cpu_governor",
     description="Gets the current CPU frequency governor and available governors.",
@@ -244,37 +443,21 @@ def get_gpu_info(**kwargs) -> str:
 def get_cpu_governor(**kwargs) -> str:
     parts = []
     try:
-        r = subprocess.run(["cat", "/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"],
-                          capture_output=True, text=True, timeout=3)
-        parts.append(f"Current Governor: {r.stdout.strip()}")
-    except Exception:
-        pass
-    try:
-        r = subprocess.run(["cat", "/sys/devices/system/cpu/cpu0/cpufreq/scaling_available_governors"],
-                          capture_output=True, text=True, timeout=3)
-        parts.append(f"Available: {r.stdout.strip()}")
-    except Exception:
-        pass
-    try:
-        r = subprocess.run(["cat", "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"],
-                          capture_output=True, text=True, timeout=3)
-        freq = int(r.stdout.strip()) / 1000
+        parts.append(f"Current Governor: {_read_sysfs(_CPUFREQ + 'scaling_governor')}")
+        parts.append(f"Available: {_available_governors()}")
+        freq = int(_read_sysfs(_CPUFREQ + "scaling_cur_freq")) / 1000
         parts.append(f"Current Frequency: {freq:.0f} MHz")
-    except Exception:
-        pass
-    try:
-        r = subprocess.run(["cat", "/sys/devices/system/cpu/cpu0/cpufreq/scaling_min_freq"],
-                          capture_output=True, text=True, timeout=3)
-        r2 = subprocess.run(["cat", "/sys/devices/system/cpu/cpu0/cpufreq/scaling_max_freq"],
-                           capture_output=True, text=True, timeout=3)
-        min_f = int(r.stdout.strip()) / 1000
-        max_f = int(r2.stdout.strip()) / 1000
+        min_f = int(_read_sysfs(_CPUFREQ + "scaling_min_freq")) / 1000
+        max_f = int(_read_sysfs(_CPUFREQ + "scaling_max_freq")) / 1000
         parts.append(f"Range: {min_f:.0f} MHz — {max_f:.0f} MHz")
-    except Exception:
-        pass
+    except (OSError, ValueError):
+        pass  # No cpufreq (VM/container) — report whatever was readable
     return "\n".join(parts) if parts else "Cannot read CPU governor info."
 
 
+_CPU_GOVERNORS = ("performance", "powersave", "schedutil", "ondemand", "conservative", "userspace")
+
+
 @skill(
     name="set_cpu_governor",
     description="Sets the CPU frequency governor. Common options: 'performance', 'powersave', 'schedutil', 'ondemand'.",
@@ -287,15 +470,13 @@ def get_cpu_governor(**kwargs) -> str:
     },
 )
 def set_cpu_governor(governor: str, **kwargs) -> str:
+    if governor not in _CPU_GOVERNORS:
+        return f"Unknown governor '{governor}'. Use one of: {', '.join(_CPU_GOVERNORS)}."
     try:
-        # Count CPUs
-        cpu_count = os.cpu_count() or 1
-        for i in range(cpu_count):
-            subprocess.run(
-                ["sudo", "bash", "-c", f"echo {governor} > /sys/devices/system/cpu/cpu{i}/cpufreq/scaling_governor"],
-                check=True, capture_output=True, timeout=5
-            )
-        return f"CPU governor set to '{governor}' on all {cpu_count} cores."
+        # One sudo tee writes every core's file — a single auth instead of one per core
+        paths = [f"/sys/devices/system/cpu/cpu{i}/cpufreq/scaling_governor" for i in range(_CPU_COUNT)]
+        _sudo_write(governor, *paths, timeout=10)
+        return f"CPU governor set to '{governor}' on all {_CPU_COUNT} cores."
     except subprocess.CalledProcessError as e:
         return f"Failed to set governor: {e.stderr}"
     except Exception as e:
@@ -324,6 +505,7 @@ def mount_device(device: str, mount_point: str = "", **kwargs) -> str:
     try:
         os.makedirs(mount_point, exist_ok=True)
         subprocess.run(["sudo", "mount", device, mount_point], check=True, capture_output=True, timeout=10)
+        get_storage_info.cache_clear()
         return f"Mounted {device} at {mount_point}."
     except subprocess.CalledProcessError as e:
         return f"Mount failed: {e.stderr}"
@@ -345,6 +527,7 @@ def mount_device(device: str, mount_point: str = "", **kwargs) -> str:
 def unmount_device(target: str, **kwargs) -> str:
     try:
         subprocess.run(["sudo", "umount", target], check=True, capture_output=True, timeout=10)
+        get_storage_info.cache_clear()
         return f"Unmounted {target}."
     except subprocess.CalledProcessError as e:
         return f"Unmount failed: {e.stderr}"
@@ -357,6 +540,7 @@ def unmount_device(target: str, **kwargs) -> str:
     description="Gets detailed storage information: all mounted filesystems, usage, and types.",
     parameters={"type": "object", "properties": {}},
 )
+@_ttl_cache(seconds=5)
 def get_storage_info(**kwargs) -> str:
     try:
         r = subprocess.run(["df", "-hT"], capture_output=True, text=True, timeout=5)
@@ -369,6 +553,156 @@ def get_storage_info(**kwargs) -> str:
 #  BLUETOOTH DEVICE MANAGEMENT
 # ═══════════════════════════════════════════════════════════════
 
+_ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]|[\x01\x02]")
+_BT_PROMPT_RE = re.compile(r"^\s*\[[^\]]*\][#>]\s*")
+_BT_LINE_SPLIT_RE = re.compile(r"[\r\n]+")
+_BT_VERSION_RE = re.compile(r"^Version \S+")
+
+
+class _BluetoothSession:
+    """
+    One interactive bluetoothctl on a pty, shared by every Bluetooth skill so a
+    scan → pair → connect sequence pays bluetoothctl's bluez/D-Bus startup once.
+    A reader thread turns its output into clean lines (ANSI codes and prompts stripped).
+    """
+
+    def __init__(self):
+        master, slave = pty.openpty()
+        try:
+            self._proc = subprocess.Popen(
+                ["bluetoothctl"], stdin=slave, stdout=slave, stderr=slave,
+                close_fds=True, start_new_session=True,
+            )
+        except Exception:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+        self._master = master
+        self._lines: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        threading.Thread(target=self._pump, daemon=True, name="bluetoothctl-reader").start()
+
+    def _pump(self):
+        pending = ""
+        while True:
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                break
+            if not data:
+                break
+            pending += _ANSI_RE.sub("", data.decode(errors="replace"))
+            *lines, pending = _BT_LINE_SPLIT_RE.split(pending)
+            for line in lines:
+                line = _BT_PROMPT_RE.sub("", line).strip()
+                if line:
+                    self._lines.put(line)
+        self._lines.put(None)  # EOF marker
+
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def close(self):
+        if self.alive():
+            self._proc.terminate()
+        try:
+            os.close(self._master)
+        except OSError:
+            pass
+
+    def run(self, command: str, done: re.Pattern, timeout: float) -> list[str]:
+        """Send `command` and collect output lines up to and including the first one matching `done`."""
+        with self._lock:
+            # Discard unsolicited events ([NEW]/[CHG]/...) left over from earlier commands
+            while True:
+                try:
+                    self._lines.get_nowait()
+                except queue.Empty:
+                    break
+            os.write(self._master, (command + "\n").encode())
+            sent = set(command.split("\n"))
+            out: list[str] = []
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    line = self._lines.get(timeout=max(remaining, 0))
+                except queue.Empty:
+                    raise subprocess.TimeoutExpired(["bluetoothctl", command], timeout)
+                if line is None:
+                    raise RuntimeError("bluetoothctl exited")
+                if line in sent:  # pty echo of what we typed
+                    continue
+                out.append(line)
+                if done.search(line):
+                    return out
+
+
+_bt_session: _BluetoothSession | None = None
+_bt_session_lock = threading.Lock()
+
+
+def _get_bt_session() -> _BluetoothSession:
+    """The shared session, (re)started if it isn't running."""
+    global _bt_session
+    with _bt_session_lock:
+        if _bt_session is None or not _bt_session.alive():
+            _bt_session = _BluetoothSession()
+        return _bt_session
+
+
+def _btctl(command: str, done: str, timeout: float = 10) -> str:
+    """Run an asynchronous bluetoothctl command and wait for its result line(s)."""
+    return "\n".join(_get_bt_session().run(command, re.compile(done), timeout))
+
+
+def _btctl_list(command: str, timeout: float = 5) -> str:
+    """Run a synchronous listing command; a trailing `version` marks the end of its output."""
+    lines = _get_bt_session().run(f"{command}\nversion", _BT_VERSION_RE, timeout)
+    return "\n".join(l for l in lines[:-1] if not l.startswith("["))
+
+
+@atexit.register
+def _close_bt_session():
+    if _bt_session is not None:
+        _bt_session.close()
+
+
+_BT_FAILED_RE = re.compile(r"Failed|not available|No default controller|org\.bluez\.Error|Invalid|Missing")
+_bt_powered = False
+
+
+def _ensure_bt_power() -> str:
+    """
+    Power the adapter on once per process; later calls are free until a command fails.
+    Returns '' when the adapter is on, otherwise a note carrying bluetoothctl's failure text.
+    """
+    global _bt_powered
+    if _bt_powered:
+        return ""
+    if "Powered: yes" in _btctl_list("show"):
+        _bt_powered = True
+        return ""
+    out = _bt_result(_btctl("power on", r"power on succeeded|Failed to set power|No default controller", timeout=5))
+    if "succeeded" in out:
+        _bt_powered = True
+        return ""
+    return f"Power on failed: {out}\n"
+
+
+def _bt_result(output: str) -> str:
+    """Forget the cached power state when bluetoothctl fails (adapter may have been switched off)."""
+    global _bt_powered
+    if _BT_FAILED_RE.search(output):
+        _bt_powered = False
+    return output
+
+
+_BT_SCAN_MIN = 2.0
+_BT_SCAN_MAX = 8.0
+
+
 @skill(
     name="bluetooth_scan",
     description="Scans for nearby Bluetooth devices.",
@@ -376,11 +710,29 @@ def get_storage_info(**kwargs) -> str:
 )
 def bluetooth_scan(**kwargs) -> str:
     try:
-        subprocess.run(["bluetoothctl", "power", "on"], capture_output=True, text=True, timeout=5)
-        r = subprocess.run(["bluetoothctl", "--timeout", "8", "scan", "on"],
-                          capture_output=True, text=True, timeout=12)
-        devices = subprocess.run(["bluetoothctl", "devices"], capture_output=True, text=True, timeout=5)
-        return f"Bluetooth Devices Found:\n{devices.stdout}" if devices.stdout.strip() else "No Bluetooth devices found nearby."
+        note = _ensure_bt_power()
+        # Scan in the background and poll the device list (0.5s, widening to 2s);
+        # stop once it has stopped growing instead of always waiting the full 8s.
+        _bt_result(_btctl("scan on", r"Discovery started|Failed to start discovery|No default controller", timeout=5))
+        try:
+            start = time.monotonic()
+            interval, last_count, stable = 0.5, -1, 0
+            listing = ""
+            while time.monotonic() - start < _BT_SCAN_MAX:
+                time.sleep(interval)
+                listing = _btctl_list("devices")
+                count = listing.count("Device ")
+                stable = stable + 1 if count == last_count else 0
+                last_count = count
+                if stable >= 2 and time.monotonic() - start >= _BT_SCAN_MIN:
+                    break
+                interval = min(interval * 1.5, 2.0)
+        finally:
+            try:
+                _btctl("scan off", r"Discovery stopped|Failed to stop discovery|No default controller", timeout=5)
+            except Exception:
+                pass
+        return note + (f"Bluetooth Devices Found:\n{listing}" if listing.strip() else "No Bluetooth devices found nearby.")
     except Exception as e:
         return f"Bluetooth scan error: {e}"
 
@@ -398,9 +750,10 @@ def bluetooth_scan(**kwargs) -> str:
 )
 def bluetooth_pair(mac_address: str, **kwargs) -> str:
     try:
-        subprocess.run(["bluetoothctl", "power", "on"], capture_output=True, timeout=3)
-        r = subprocess.run(["bluetoothctl", "pair", mac_address], capture_output=True, text=True, timeout=15)
-        return f"Pair result: {r.stdout}\n{r.stderr}"
+        note = _ensure_bt_power()
+        out = _bt_result(_btctl(f"pair {mac_address}", r"Pairing successful|" + _BT_FAILED_RE.pattern, timeout=15))
+        list_paired_bluetooth.cache_clear()
+        return f"{note}Pair result: {out}"
     except Exception as e:
         return f"Pairing error: {e}"
 
@@ -418,8 +771,9 @@ def bluetooth_pair(mac_address: str, **kwargs) -> str:
 )
 def bluetooth_connect(mac_address: str, **kwargs) -> str:
     try:
-        r = subprocess.run(["bluetoothctl", "connect", mac_address], capture_output=True, text=True, timeout=10)
-        return f"Connect result: {r.stdout}\n{r.stderr}"
+        note = _ensure_bt_power()
+        out = _bt_result(_btctl(f"connect {mac_address}", r"Connection successful|" + _BT_FAILED_RE.pattern, timeout=10))
+        return f"{note}Connect result: {out}"
     except Exception as e:
         return f"Connect error: {e}"
 
@@ -437,8 +791,8 @@ def bluetooth_connect(mac_address: str, **kwargs) -> str:
 )
 def bluetooth_disconnect(mac_address: str, **kwargs) -> str:
     try:
-        r = subprocess.run(["bluetoothctl", "disconnect", mac_address], capture_output=True, text=True, timeout=10)
-        return f"Disconnect result: {r.stdout}"
+        out = _btctl(f"disconnect {mac_address}", r"Successful disconnected|" + _BT_FAILED_RE.pattern, timeout=10)
+        return f"Disconnect result: {out}"
     except Exception as e:
         return f"Disconnect error: {e}"
 
@@ -448,10 +802,11 @@ def bluetooth_disconnect(mac_address: str, **kwargs) -> str:
     description="Lists all paired Bluetooth devices.",
     parameters={"type": "object", "properties": {}},
 )
+@_ttl_cache(seconds=30)
 def list_paired_bluetooth(**kwargs) -> str:
     try:
-        r = subprocess.run(["bluetoothctl", "devices", "Paired"], capture_output=True, text=True, timeout=5)
-        return f"Paired Devices:\n{r.stdout}" if r.stdout.strip() else "No paired devices."
+        out = _btctl_list("devices Paired")
+        return f"Paired Devices:\n{out}" if out.strip() else "No paired devices."
     except Exception as e:
         return f"Error: {e}"
 
@@ -460,6 +815,24 @@ def list_paired_bluetooth(**kwargs) -> str:
 #  KEYBOARD BACKLIGHT
 # ═══════════════════════════════════════════════════════════════
 
+_kbd_backlight_path: str | None = None
+
+
+def _find_kbd_backlight() -> str | None:
+    """brightness file of the first *kbd_backlight LED; one scandir, then cached."""
+    global _kbd_backlight_path
+    if _kbd_backlight_path is None:
+        try:
+            with os.scandir("/sys/class/leds") as it:
+                for entry in it:
+                    if entry.name.endswith("kbd_backlight"):
+                        _kbd_backlight_path = f"{entry.path}/brightness"
+                        break
+        except OSError:
+            pass
+    return _kbd_backlight_path
+
+
 @skill(
     name="set_keyboard_backlight",
     description="Sets the keyboard backlight brightness. Level: 0 (off) to max (usually 2 or 3).",
@@ -472,25 +845,17 @@ def list_paired_bluetooth(**kwargs) -> str:
     },
 )
 def set_keyboard_backlight(level: int, **kwargs) -> str:
-    # Try multiple methods
-    paths = [
-        "/sys/class/leds/tpacpi::kbd_backlight/brightness",
-        "/sys/class/leds/asus::kbd_backlight/brightness",
-        "/sys/class/leds/smc::kbd_backlight/brightness",
-    ]
-    # Also try finding any kbd_backlight
-    import glob
-    paths.extend(glob.glob("/sys/class/leds/*kbd_backlight/brightness"))
-
-    for path in paths:
-        if os.path.exists(path):
-            try:
-                subprocess.run(["sudo", "bash", "-c", f"echo {level} > {path}"],
-                              check=True, capture_output=True, timeout=3)
-                return f"Keyboard backlight set to {level}."
-            except Exception:
-                continue
+    # Direct sysfs write (covers tpacpi::, asus::, smc:: and any other *kbd_backlight LED)
+    path = _find_kbd_backlight()
+    if path:
+        try:
+            _sudo_write(int(level), path, timeout=3)
+            return f"Keyboard backlight set to {level}."
+        except Exception:
+            pass
     # Try brightnessctl
+    if not _have("brightnessctl"):
+        return "No keyboard backlight device found."
     try:
         subprocess.run(["brightnessctl", "--device=*kbd_backlight", "set", str(level)],
                       check=True, capture_output=True, timeout=5)
@@ -504,6 +869,20 @@ def set_keyboard_backlight(level: int, **kwargs) -> str:
 #  TOUCHPAD CONTROL
 # ═══════════════════════════════════════════════════════════════
 
+_touchpad_id: str | None = None
+
+
+def _find_touchpad_id() -> str | None:
+    """Find the touchpad's xinput device id."""
+    r = subprocess.run(["xinput", "list"], capture_output=True, text=True, timeout=5)
+    for line in r.stdout.split("\n"):
+        if "touchpad" in line.lower() or "trackpad" in line.lower():
+            parts = line.split("id=")
+            if len(parts) > 1:
+                return parts[1].split()[0]
+    return None
+
+
 @skill(
     name="toggle_touchpad",
     description="Enables or disables the laptop touchpad.",
@@ -516,22 +895,27 @@ def set_keyboard_backlight(level: int, **kwargs) -> str:
     },
 )
 def toggle_touchpad(state: str, **kwargs) -> str:
+    global _touchpad_id
     try:
-        # Find touchpad device ID
-        r = subprocess.run(["xinput", "list"], capture_output=True, text=True, timeout=5)
-        touchpad_id = None
-        for line in r.stdout.split("\n"):
-            if "touchpad" in line.lower() or "trackpad" in line.lower():
-                parts = line.split("id=")
-                if len(parts) > 1:
-                    touchpad_id = parts[1].split()[0]
-                    break
-        if not touchpad_id:
+        enable = "1" if state.lower() == "on" else "0"
+        cached = _touchpad_id is not None
+        if not cached:
+            _touchpad_id = _find_touchpad_id()
+        if not _touchpad_id:
             return "No touchpad device found."
 
-        enable = "1" if state.lower() == "on" else "0"
-        subprocess.run(["xinput", "set-prop", touchpad_id, "Device Enabled", enable],
-                      check=True, capture_output=True, timeout=5)
+        try:
+            subprocess.run(["xinput", "set-prop", _touchpad_id, "Device Enabled", enable],
+                          check=True, capture_output=True, timeout=5)
+        except subprocess.CalledProcessError:
+            if not cached:
+                raise
+            # Device ids change on replug/resume — re-detect once and retry
+            _touchpad_id = _find_touchpad_id()
+            if not _touchpad_id:
+                return "No touchpad device found."
+            subprocess.run(["xinput", "set-prop", _touchpad_id, "Device Enabled", enable],
+                          check=True, capture_output=True, timeout=5)
         return f"Touchpad {'enabled' if state == 'on' else 'disabled'}."
     except Exception as e:
         return f"Error: {e}"
@@ -579,6 +963,28 @@ def connect_wifi(ssid: str, password: str = "", **kwargs) -> str:
         return f"Error: {e}"
 
 
+_SPEEDTEST_URL = "https://speed.cloudflare.com/__down?bytes=10000000"
+_SPEEDTEST_MAX_SECONDS = 3.0
+_SPEEDTEST_MAX_BYTES = 10_000_000
+
+
+def _measure_download_mbps() -> float:
+    """Stream the test file in-process; stop after 3s or 10 MB, whichever comes first."""
+    req = urllib.request.Request(_SPEEDTEST_URL, headers={"User-Agent": "Mozilla/5.0"})
+    start = time.monotonic()
+    received = 0
+    with urllib.request.urlopen(req, timeout=30) as r:
+        while received < _SPEEDTEST_MAX_BYTES:
+            chunk = r.read(65536)
+            if not chunk:
+                break
+            received += len(chunk)
+            if time.monotonic() - start >= _SPEEDTEST_MAX_SECONDS:
+                break
+    elapsed = time.monotonic() - start
+    return (received * 8) / (elapsed * 1_000_000) if elapsed > 0 else 0.0
+
+
 @skill(
     name="get_network_speed",
     description="Tests internet download/upload speed.",
@@ -586,20 +992,25 @@ def connect_wifi(ssid: str, password: str = "", **kwargs) -> str:
 )
 def get_network_speed(**kwargs) -> str:
     try:
-        # Quick ping test first
-        r = subprocess.run(["ping", "-c", "3", "8.8.8.8"],
-                          capture_output=True, text=True, timeout=10)
-        ping_line = [l for l in r.stdout.split("\n") if "avg" in l]
+        # Ping runs in the background while the download is timed in-process
+        try:
+            ping = subprocess.Popen(["ping", "-c", "3", "8.8.8.8"],
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError:
+            ping = None
+        ping_out = ""
+        try:
+            speed_mbps = _measure_download_mbps()
+        finally:
+            if ping is not None:
+                try:
+                    ping_out, _ = ping.communicate(timeout=10)
+                except subprocess.TimeoutExpired:
+                    ping.kill()
+                    ping_out, _ = ping.communicate()
+        ping_line = [l for l in ping_out.split("\n") if "avg" in l]
         ping_info = ping_line[0] if ping_line else "Ping test failed"
 
-        # Basic speed test via curl
-        r = subprocess.run(
-            ["curl", "-s", "-o", "/dev/null", "-w", "%{speed_download}", "https://speed.cloudflare.com/__down?bytes=10000000"],
-            capture_output=True, text=True, timeout=30
-        )
-        speed_bps = float(r.stdout)
-        speed_mbps = (speed_bps * 8) / 1_000_000
-
         return f"Ping: {ping_info}\nDownload: {speed_mbps:.1f} Mbps"
     except Exception as e:
         return f"Speed test error: {e}"
@@ -659,8 +1070,9 @@ def manage_swap(action: str, **kwargs) -> str:
             return f"Error: {e}"
     elif action == "clear":
         try:
-            subprocess.run(["sudo", "swapoff", "-a"], check=True, capture_output=True, timeout=30)
-            subprocess.run(["sudo", "swapon", "-a"], check=True, capture_output=True, timeout=10)
+            # One privileged shell for both steps — a single sudo/PAM round-trip
+            subprocess.run(["sudo", "sh", "-c", "swapoff -a && swapon -a"],
+                           check=True, capture_output=True, timeout=40)
             return "Swap cleared and re-enabled."
         except Exception as e:
             return f"Error clearing swap: {e}"
@@ -686,8 +1098,8 @@ def manage_swap(action: str, **kwargs) -> str:
 )
 def drop_caches(**kwargs) -> str:
     try:
-        subprocess.run(["sudo", "bash", "-c", "sync; echo 3 > /proc/sys/vm/drop_caches"],
-                      check=True, capture_output=True, timeout=10)
+        os.sync()
+        _sudo_write(3, "/proc/sys/vm/drop_caches", timeout=10)
         import psutil
         mem = psutil.virtual_memory()
         return f"Caches dropped. RAM now: {mem.percent}% used ({mem.available / (1024**3):.1f} GB free)"
@@ -699,15 +1111,50 @@ def drop_caches(**kwargs) -> str:
 #  FAN CONTROL
 # ═══════════════════════════════════════════════════════════════
 
+_FAN_INPUT_RE = re.compile(r"fan\d+_input")
+
+
+def _read_hwmon_fans() -> list[str]:
+    """'label: N RPM' for every fan*_input under /sys/class/hwmon (what `sensors` reads, minus Perl)."""
+    fans = []
+    try:
+        with os.scandir("/sys/class/hwmon") as hwmons:
+            for hw in hwmons:
+                try:
+                    with os.scandir(hw.path) as files:
+                        names = sorted(f.name for f in files if _FAN_INPUT_RE.fullmatch(f.name))
+                except OSError:
+                    continue
+                for name in names:
+                    try:
+                        rpm = int(_read_sysfs(f"{hw.path}/{name}"))
+                    except (OSError, ValueError):
+                        continue
+                    try:
+                        label = _read_sysfs(f"{hw.path}/{name[:-len('_input')]}_label")
+                    except OSError:
+                        label = name[:-len("_input")]
+                    fans.append(f"{label}: {rpm} RPM")
+    except OSError:
+        pass
+    return fans
+
+
 @skill(
     name="get_fan_speed",
     description="Reads current fan RPM from sensors.",
     parameters={"type": "object", "properties": {}},
 )
 def get_fan_speed(**kwargs) -> str:
+    fans = _read_hwmon_fans()
+    if fans:
+        return "Fan Status:\n" + "\n".join(f"  {f}" for f in fans)
+    # No hwmon fan inputs (or unreadable) — fall back to lm-sensors' view
+    if not _have("sensors"):
+        return "lm-sensors not installed."
     try:
         r = subprocess.run(["sensors"], capture_output=True, text=True, timeout=5)
-        fan_lines = [l for l in r.stdout.split("\n") if "fan" in l.lower() or "RPM" in l]
+        fan_lines = _FAN_LINE_RE.findall(r.stdout)
         if fan_lines:
             return "Fan Status:\n" + "\n".join(f"  {l.strip()}" for l in fan_lines)
         return "No fan speed data found in sensors output."
@@ -727,6 +1174,14 @@ def get_fan_speed(**kwargs) -> str:
     parameters={"type": "object", "properties": {}},
 )
 def get_clipboard(**kwargs) -> str:
+    if pyperclip is not None:
+        try:
+            content = pyperclip.paste()[:2000]  # Limit
+            return f"Clipboard content:\n{content}" if content else "Clipboard is empty."
+        except Exception as e:
+            logger.debug("pyperclip paste failed, falling back to xclip: %s", e)
+    if not _have("xclip"):
+        return "xclip not installed. Install with: sudo apt install xclip"
     try:
         r = subprocess.run(["xclip", "-selection", "clipboard", "-o"],
                           capture_output=True, text=True, timeout=5)
@@ -750,6 +1205,14 @@ def get_clipboard(**kwargs) -> str:
     },
 )
 def set_clipboard(text: str, **kwargs) -> str:
+    if pyperclip is not None:
+        try:
+            pyperclip.copy(text)
+            return f"Copied {len(text)} characters to clipboard."
+        except Exception as e:
+            logger.debug("pyperclip copy failed, falling back to xclip: %s", e)
+    if not _have("xclip"):
+        return "xclip not installed."
     try:
         p = subprocess.Popen(["xclip", "-selection", "clipboard"],
                             stdin=subprocess.PIPE)
@@ -6,19 +6,72 @@ Includes process annihilation, deep firmware/kernel insight, firewall mastery,
 and audio/video stream hijacking.
 """
 
+import atexit
 import logging
 import os
+import re
+import signal
+import socket
 import subprocess
 import shutil
+import threading
+import time
 
 from skills import skill
+from skills._subproc_cache import cached_run, invalidate
+from skills._sudo_helper import sudo_pipe, sudo_run
+from skills._process_tracker import tracked_run
+
+try:
+    import pulsectl  # Optional: one persistent libpulse connection instead of a pactl fork per call
+except ImportError:
+    pulsectl = None
 
 logger = logging.getLogger("jarvis.skills.omni_control")
 
+# Resolved once — PATH lookups stat every directory, and absolute argv skips execvp's search
+_UFW_PATH = shutil.which("ufw")
+_PACTL_PATH = shutil.which("pactl")
+
 # ═══════════════════════════════════════════════════════════════
 #  USER & PROCESS ANNIHILATION
 # ═══════════════════════════════════════════════════════════════
 
+_ERE_SPECIAL = re.compile(r"([.^$*+?()\[\]{}|\\])")
+
+
+def _resolve_pids(names: list[str]) -> list[int]:
+    """PIDs whose process name is exactly one of `names` — one pass over the process table."""
+    me = os.getpid()
+    try:
+        import psutil
+    except ImportError:
+        pattern = "|".join(_ERE_SPECIAL.sub(r"\\\1", n) for n in names)
+        r = tracked_run(["pgrep", "-x", pattern], capture_output=True, text=True, timeout=5)
+        return [pid for pid in map(int, r.stdout.split()) if pid != me]
+
+    # psutil's name() also resolves names longer than the kernel's 15-char comm, as killall does
+    wanted = set(names)
+    return [
+        p.info["pid"] for p in psutil.process_iter(["pid", "name"])
+        if p.info["name"] in wanted and p.info["pid"] != me
+    ]
+
+
+def _sigkill_all(pids: list[int]) -> tuple[list[int], list[int], list[int]]:
+    """SIGKILL each PID directly. Returns (killed, denied, missing)."""
+    killed, denied, missing = [], [], []
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+            killed.append(pid)
+        except PermissionError:
+            denied.append(pid)
+        except ProcessLookupError:
+            missing.append(pid)
+    return killed, denied, missing
+
+
 @skill(
     name="nuke_process",
     description="Forcefully terminates a process by PID or name using SIGKILL (-9). Faster and more brutal than standard close.",
@@ -27,22 +80,44 @@ logger = logging.getLogger("jarvis.skills.omni_control")
         "properties": {
             "target": {
                 "type": "string",
-                "description": "PID (number) or exact process name.",
+                "description": "PID (number) or exact process name. Several targets may be comma-separated.",
             }
         },
         "required": ["target"],
     },
 )
-def nuke_process(target: str, **kwargs) -> str:
+def nuke_process(target, **kwargs) -> str:
+    targets = target if isinstance(target, list) else str(target).split(",")
+    targets = [str(t).strip() for t in targets if str(t).strip()]
+    if not targets:
+        return "No target provided."
     try:
-        if target.isdigit():
-            subprocess.run(["sudo", "kill", "-9", target], check=True, capture_output=True, timeout=5)
-            return f"Process with PID {target} annihilated."
-        else:
-            subprocess.run(["sudo", "killall", "-9", target], check=True, capture_output=True, timeout=5)
-            return f"All processes named '{target}' annihilated."
+        names = [t for t in targets if not t.isdigit()]
+        pids = [int(t) for t in targets if t.isdigit()]
+        if names:
+            pids += _resolve_pids(names)
+        if not pids:
+            return f"Failed to nuke process: no process named {', '.join(repr(n) for n in names)} found."
+
+        # Signal what we own straight from Python; escalate the rest in one sudo call
+        killed, denied, missing = _sigkill_all(list(dict.fromkeys(pids)))
+        if denied:
+            sudo_run(["kill", "-9", *map(str, denied)], check=True, timeout=5)
+            killed += denied
+        invalidate("ss")  # Cached socket listings name the dead processes
+
+        if not killed:
+            return f"Failed to nuke process: no process with PID {', '.join(map(str, missing))}."
+        if len(targets) == 1:
+            if names:
+                return f"All processes named '{targets[0]}' annihilated."
+            return f"Process with PID {targets[0]} annihilated."
+        msg = f"Annihilated {len(killed)} process(es): {', '.join(map(str, killed))}."
+        if missing:
+            msg += f" Already gone: {', '.join(map(str, missing))}."
+        return msg
     except subprocess.CalledProcessError as e:
-        return f"Failed to nuke process: {e.stderr.decode('utf-8', errors='replace').strip()}"
+        return f"Failed to nuke process: {e.stderr.strip()}"
     except Exception as e:
         return f"Error: {e}"
 
@@ -63,7 +138,8 @@ def nuke_process(target: str, **kwargs) -> str:
 )
 def kill_tty_session(tty_name: str, **kwargs) -> str:
     try:
-        subprocess.run(["sudo", "pkill", "-9", "-t", tty_name], check=True, capture_output=True, timeout=5)
+        sudo_run(["pkill", "-9", "-t", tty_name], check=True, timeout=5)
+        invalidate("ss")
         return f"All processes on {tty_name} forcefully terminated."
     except subprocess.CalledProcessError as e:
         return f"Failed to kill TTY session: No processes matched or insufficient permissions."
@@ -94,14 +170,13 @@ def kill_tty_session(tty_name: str, **kwargs) -> str:
 )
 def read_kernel_logs(source: str = "dmesg", lines: int = 30, **kwargs) -> str:
     try:
+        lines = max(1, int(lines))
         if source == "journal":
-            r = subprocess.run(["sudo", "journalctl", "-p", "3", "-b", "-n", str(lines)], 
-                              capture_output=True, text=True, timeout=10)
+            r = sudo_run(["journalctl", "-p", "3", "-b", "-n", str(lines)], timeout=10)
         else:
-            r = subprocess.run(["sudo", "dmesg", "-T"], capture_output=True, text=True, timeout=10)
-            logs = r.stdout.strip().split('\n')[-lines:]
-            r.stdout = '\n'.join(logs)
-            
+            # Only the last `lines` lines cross the pipe, not the whole ring buffer
+            r = sudo_pipe(["dmesg", "-T"], ["tail", "-n", str(lines)], timeout=10)
+
         return r.stdout.strip() if r.stdout.strip() else f"No recent logs found for {source}."
     except Exception as e:
         return f"Error reading logs: {e}"
@@ -114,7 +189,7 @@ def read_kernel_logs(source: str = "dmesg", lines: int = 30, **kwargs) -> str:
 )
 def list_kernel_modules(**kwargs) -> str:
     try:
-        r = subprocess.run(["lsmod"], capture_output=True, text=True, timeout=5)
+        r = cached_run(["lsmod"], ttl=5, timeout=5)
         return f"Loaded Kernel Modules (first 40):\n" + "\n".join(r.stdout.split('\n')[:40])
     except Exception as e:
         return f"Error reading kernel modules: {e}"
@@ -143,21 +218,27 @@ def list_kernel_modules(**kwargs) -> str:
     },
 )
 def manage_firewall(action: str, port: str = "", **kwargs) -> str:
-    if shutil.which("ufw") is None:
+    if _UFW_PATH is None:
         return "UFW (Uncomplicated Firewall) is not installed on this system."
         
     action = action.lower()
     try:
         if action in ["status", "enable", "disable"]:
-            cmd = ["sudo", "ufw", action]
+            cmd = ["sudo", _UFW_PATH, action]
         elif action in ["allow", "deny"]:
             if not port:
                 return f"Port must be specified for action '{action}'."
-            cmd = ["sudo", "ufw", action, port]
+            cmd = ["sudo", _UFW_PATH, action, port]
         else:
             return f"Invalid action: {action}"
             
-        r = subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=10)
+        if action == "status":
+            r = cached_run(cmd, ttl=5, timeout=10)
+            if r.returncode != 0:
+                raise subprocess.CalledProcessError(r.returncode, cmd, r.stdout, r.stderr)
+            return r.stdout.strip()
+        r = sudo_run(cmd[1:], check=True, timeout=10)
+        invalidate("sudo", _UFW_PATH)
         return r.stdout.strip()
     except subprocess.CalledProcessError as e:
         return f"Firewall command failed: {e.stderr.strip()}"
@@ -165,14 +246,80 @@ def manage_firewall(action: str, port: str = "", **kwargs) -> str:
         return f"Error managing firewall: {e}"
 
 
+# /proc/net/{tcp,udp}[6] state codes for what `ss -l` shows: TCP LISTEN, UDP unconnected
+_LISTEN_STATES = {"tcp": ("0A", "LISTEN"), "udp": ("07", "UNCONN")}
+
+
+def _decode_addr(hex_addr: str) -> str:
+    """'0100007F:0050' -> '127.0.0.1:80' (kernel prints each 32-bit word in host byte order)."""
+    host, port = hex_addr.split(":")
+    raw = bytes.fromhex(host)
+    raw = b"".join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    if len(raw) == 4:
+        return f"{socket.inet_ntop(socket.AF_INET, raw)}:{int(port, 16)}"
+    return f"[{socket.inet_ntop(socket.AF_INET6, raw)}]:{int(port, 16)}"
+
+
+def _listening_sockets() -> list[tuple]:
+    """(netid, state, local, peer, inode) for every listening TCP/UDP socket, like `ss -tunl`."""
+    sockets = []
+    for proto, (code, state) in _LISTEN_STATES.items():
+        for suffix in ("", "6"):
+            try:
+                with open(f"/proc/net/{proto}{suffix}") as f:
+                    next(f, None)  # Header
+                    for line in f:
+                        fields = line.split()
+                        if fields[3] == code:
+                            sockets.append((proto, state, _decode_addr(fields[1]), _decode_addr(fields[2]), fields[9]))
+            except FileNotFoundError:
+                continue  # e.g. IPv6 disabled
+    return sockets
+
+
+def _socket_owners(inodes: set[str]) -> dict[str, str]:
+    """Map socket inodes to 'comm/pid' by scanning /proc/*/fd — only processes we may inspect, like ss without sudo."""
+    owners = {}
+    wanted = {f"socket:[{i}]": i for i in inodes}
+    with os.scandir("/proc") as procs:
+        for proc in procs:
+            if not proc.name.isdigit():
+                continue
+            try:
+                with os.scandir(f"/proc/{proc.name}/fd") as fds:
+                    for fd in fds:
+                        inode = wanted.get(os.readlink(fd.path))
+                        if inode and inode not in owners:
+                            with open(f"/proc/{proc.name}/comm") as f:
+                                owners[inode] = f"{f.read().strip()}/{proc.name}"
+            except OSError:
+                continue  # Not ours, or exited mid-scan
+            if len(owners) == len(wanted):
+                break
+    return owners
+
+
 @skill(
     name="list_active_connections",
     description="Lists all active network connections and listening ports using ss/netstat.",
     parameters={"type": "object", "properties": {}},
 )
 def list_active_connections(**kwargs) -> str:
+    # Read the kernel tables ss itself reads, without forking it
+    try:
+        sockets = _listening_sockets()
+        owners = _socket_owners({sk[4] for sk in sockets[:30]})
+        lines = [f"{'Netid':<6}{'State':<8}{'Local Address:Port':<42}{'Peer Address:Port':<42}Process"]
+        for netid, state, local, peer, inode in sockets:
+            lines.append(f"{netid:<6}{state:<8}{local:<42}{peer:<42}{owners.get(inode, '')}".rstrip())
+        if len(lines) > 30:
+            return "Active Connections (Listening):\n" + "\n".join(lines[:30]) + f"\n... ({len(lines)-30} more omitted)"
+        return "Active Connections (Listening):\n" + "\n".join(lines)
+    except OSError as e:
+        logger.debug("/proc/net unreadable, falling back to ss: %s", e)
+
     try:
-        r = subprocess.run(["ss", "-tunlp"], capture_output=True, text=True, timeout=10)
+        r = cached_run(["ss", "-tunlp"], ttl=5, timeout=10)
         # We need sudo to see process names for all ports, but we'll try without first.
         # If running as root or if it's user-owned, it'll show.
         if r.returncode == 0:
@@ -189,6 +336,76 @@ def list_active_connections(**kwargs) -> str:
 #  AUDIO/VIDEO STREAM HIJACKING
 # ═══════════════════════════════════════════════════════════════
 
+_PACTL_WATCH_WARMUP = 1.0  # Seconds `pactl subscribe` must survive before its invalidations are trusted
+_pactl_proc: subprocess.Popen | None = None
+_pactl_watcher: threading.Thread | None = None
+_pactl_started = 0.0
+_pactl_watcher_lock = threading.Lock()  # The self-heal thread can list streams alongside the main loop
+
+
+def _watch_pactl_events(proc: subprocess.Popen):
+    """Drop the cached sink-input listing whenever PulseAudio reports a sink-input change."""
+    try:
+        for line in proc.stdout:
+            if "sink-input" in line:
+                invalidate(_PACTL_PATH, "list", "sink-inputs")
+    finally:
+        proc.wait()  # Reap it
+        # subscribe ended (server restart) — forget what we cached; the next list starts a new watcher
+        invalidate(_PACTL_PATH, "list", "sink-inputs")
+
+
+def _stop_pactl_watcher():
+    with _pactl_watcher_lock:
+        proc = _pactl_proc
+    if proc is not None and proc.poll() is None:
+        proc.terminate()
+
+
+atexit.register(_stop_pactl_watcher)
+
+
+def _ensure_pactl_watcher() -> bool:
+    """
+    Start `pactl subscribe` unless it is already running. True once it has been up for
+    _PACTL_WATCH_WARMUP: before that it may not have connected yet, and a change in that
+    window would go unseen, so callers should keep using a short cache TTL.
+    """
+    global _pactl_proc, _pactl_watcher, _pactl_started
+    with _pactl_watcher_lock:
+        if _pactl_watcher is None or not _pactl_watcher.is_alive():
+            try:
+                proc = subprocess.Popen([_PACTL_PATH, "subscribe"], stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True)
+            except OSError:
+                return False
+            _pactl_proc = proc
+            _pactl_started = time.monotonic()
+            _pactl_watcher = threading.Thread(target=_watch_pactl_events, args=(proc,), daemon=True,
+                                              name="pactl-subscribe")
+            _pactl_watcher.start()
+        return time.monotonic() - _pactl_started >= _PACTL_WATCH_WARMUP
+
+
+_pulse = None
+_pulse_lock = threading.Lock()  # A libpulse client must not be used from two threads at once
+
+
+def _pulse_call(method: str, *args):
+    """Call `method` on the shared pulsectl client, connecting (or reconnecting once) as needed."""
+    global _pulse
+    with _pulse_lock:
+        for attempt in range(2):
+            if _pulse is None:
+                _pulse = pulsectl.Pulse("jarvis-hijack")
+            try:
+                return getattr(_pulse, method)(*args)
+            except pulsectl.PulseDisconnected:
+                _pulse.close()
+                _pulse = None
+                if attempt:
+                    raise
+
 @skill(
     name="audio_stream_hijack",
     description="Intercepts or controls active PulseAudio/Pipewire streams at a low level.",
@@ -208,16 +425,42 @@ def list_active_connections(**kwargs) -> str:
     },
 )
 def audio_stream_hijack(action: str, sink_input_id: str = "", **kwargs) -> str:
+    if pulsectl is not None and action in ("list_streams", "kill_stream"):
+        try:
+            if action == "list_streams":
+                streams = _pulse_call("sink_input_list")
+                if streams:
+                    lines = [
+                        f"{si.index}\t{si.name}\t{si.proplist.get('application.name', si.client)}"
+                        for si in streams
+                    ]
+                    return "Active Audio Streams:\n" + "\n".join(lines)
+                return "No active audio streams playing right now."
+            if not sink_input_id:
+                return "sink_input_id required to kill a stream."
+            _pulse_call("sink_input_kill", int(sink_input_id))
+            return f"Successfully killed audio stream ID {sink_input_id}."
+        except ValueError:
+            return f"Invalid sink_input_id: {sink_input_id}"
+        except pulsectl.PulseOperationFailed:
+            return f"PulseAudio command failed: no stream with ID {sink_input_id}."
+        except Exception as e:
+            logger.debug("pulsectl failed, falling back to pactl: %s", e)
+    if _PACTL_PATH is None:
+        return "Error manipulating audio streams: pactl not found (install pulseaudio-utils)."
     try:
         if action == "list_streams":
-            r = subprocess.run(["pactl", "list", "sink-inputs", "short"], capture_output=True, text=True, timeout=5)
+            # Event-driven invalidation lets the listing be cached far longer than the polling TTL
+            ttl = 300 if _ensure_pactl_watcher() else 5
+            r = cached_run([_PACTL_PATH, "list", "sink-inputs", "short"], ttl=ttl, timeout=5)
             if r.stdout.strip():
                 return f"Active Audio Streams:\n{r.stdout.strip()}"
             return "No active audio streams playing right now."
         elif action == "kill_stream":
             if not sink_input_id:
                 return "sink_input_id required to kill a stream."
-            subprocess.run(["pactl", "kill-sink-input", sink_input_id], check=True, capture_output=True, timeout=5)
+            tracked_run([_PACTL_PATH, "kill-sink-input", sink_input_id], check=True, capture_output=True, timeout=5)
+            invalidate(_PACTL_PATH)
             return f"Successfully killed audio stream ID {sink_input_id}."
         else:
             return f"Invalid action: {action}"
@@ -1,9 +1,51 @@
 import logging
-import subprocess
+import shutil
+import threading
 from skills import skill
+from skills._process_tracker import tracked_run
+
+try:
+    # Optional: talk to logind directly instead of forking systemctl (which makes the same D-Bus call)
+    from jeepney import DBusAddress, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+except ImportError:
+    open_dbus_connection = None
 
 logger = logging.getLogger("jarvis.skills.power_management")
 
+_SYS76_PATH = shutil.which("system76-power")  # Resolved once at import
+
+_system_bus = None
+_bus_lock = threading.Lock()
+
+
+def _logind_call(method: str):
+    """Call org.freedesktop.login1.Manager.<method>(interactive=False) on a reused system-bus connection."""
+    global _system_bus
+    logind = DBusAddress("/org/freedesktop/login1", bus_name="org.freedesktop.login1",
+                         interface="org.freedesktop.login1.Manager")
+    with _bus_lock:
+        if _system_bus is None:
+            _system_bus = open_dbus_connection(bus="SYSTEM")
+        try:
+            unwrap_msg(_system_bus.send_and_get_reply(new_method_call(logind, method, "b", (False,)), timeout=10))
+        except Exception:
+            _system_bus.close()
+            _system_bus = None
+            raise
+
+
+def _power_action(method: str, verb: str):
+    """logind over D-Bus when jeepney is available, `systemctl <verb>` otherwise (or if D-Bus fails)."""
+    if open_dbus_connection is not None:
+        try:
+            _logind_call(method)
+            return
+        except Exception as e:
+            logger.debug("logind %s over D-Bus failed, falling back to systemctl: %s", method, e)
+    tracked_run(["systemctl", verb], check=True, text=True, capture_output=True)
+
 
 @skill(
     name="suspend_system",
@@ -12,7 +54,7 @@ logger = logging.getLogger("jarvis.skills.power_management")
 )
 def suspend_system(**kwargs) -> str:
     try:
-        subprocess.run(["systemctl", "suspend"], check=True, text=True, capture_output=True)
+        _power_action("Suspend", "suspend")
         return "System suspend initiated."
     except Exception as e:
         return f"Error suspending system: {e}"
@@ -25,7 +67,7 @@ def suspend_system(**kwargs) -> str:
 )
 def reboot_system(**kwargs) -> str:
     try:
-        subprocess.run(["systemctl", "reboot"], check=True, text=True, capture_output=True)
+        _power_action("Reboot", "reboot")
         return "System reboot initiated."
     except Exception as e:
         return f"Error rebooting system: {e}"
@@ -57,7 +99,9 @@ def set_power_profile(profile_name: str, **kwargs) -> str:
         if not internal_name:
             return f"Error: Unknown profile '{profile_name}'. Use 'Battery Life', 'Balanced', or 'Performance'."
 
-        subprocess.run(["system76-power", "profile", internal_name], check=True, text=True, capture_output=True)
+        if _SYS76_PATH is None:
+            raise FileNotFoundError("system76-power")
+        tracked_run([_SYS76_PATH, "profile", internal_name], check=True, text=True, capture_output=True)
         return f"Successfully set power profile to: {profile_name.title()}"
     except FileNotFoundError:
         return "Error: system76-power not found. This might not be a System76/Pop!_OS machine, or you lack permissions."
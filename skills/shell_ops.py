@@ -7,9 +7,24 @@ Includes safety checks to prevent destructive commands.
 
 import logging
 import os
+import re
+import secrets
 import subprocess
+import threading
+from pathlib import Path
 
 from skills import skill
+from skills._process_tracker import tracked_run
+
+try:
+    import ahocorasick  # Optional: one linear scan matches every risk pattern at once
+except ImportError:
+    ahocorasick = None
+
+try:
+    import re2 as _risk_re  # Optional: DFA engine, linear time even on adversarial input
+except ImportError:
+    _risk_re = re
 
 logger = logging.getLogger("jarvis.skills.shell")
 
@@ -56,36 +71,80 @@ WARNING_PATTERNS = [
 ]
 
 
+def _build_automaton(patterns: list[str]):
+    """Aho–Corasick automaton over `patterns`, or None when pyahocorasick isn't installed."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for pattern in patterns:
+        automaton.add_word(pattern, pattern)
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_regex(patterns: list[str]):
+    """All `patterns` as one literal alternation — a single C-level scan instead of N `in` checks."""
+    # Escape only metacharacters — re2 rejects re.escape's escaped spaces
+    return _risk_re.compile("|".join(re.sub(r"([.^$*+?()\[\]{}|\\])", r"\\\1", p) for p in patterns))
+
+
+_DANGER_AC = _build_automaton(DANGEROUS_PATTERNS)
+_WARNING_AC = _build_automaton(WARNING_PATTERNS)
+_DANGER_RE = _build_regex(DANGEROUS_PATTERNS)
+_WARNING_RE = _build_regex(WARNING_PATTERNS)
+
+
+def _first_match(automaton, regex, text: str) -> str | None:
+    """A pattern occurring in `text`, if any."""
+    if automaton is not None:
+        for _, pattern in automaton.iter(text):
+            return pattern
+        return None
+    m = regex.search(text)
+    return m.group(0) if m else None
+
+
+_ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+_unsafe_cache = {"mtime": None, "value": False}
+
+
+def _unsafe_mode() -> bool:
+    """config.unsafe_mode, rebuilt only when .env changes rather than on every command."""
+    try:
+        mtime = _ENV_FILE.stat().st_mtime_ns
+    except OSError:
+        mtime = 0
+    if _unsafe_cache["mtime"] != mtime:
+        from config import load_config
+        _unsafe_cache.update(mtime=mtime, value=bool(load_config().unsafe_mode))
+    return _unsafe_cache["value"]
+
+
 def _assess_command_risk(command: str) -> tuple[str, str]:
     """
     Assess the risk level of a command.
     Returns: (risk_level, reason)
         risk_level: 'blocked', 'dangerous', 'warning', 'safe'
     """
-    # Import config to check unsafe mode
+    cmd_lower = command.lower().strip()
+
+    # Check unsafe mode
     try:
-        from config import load_config
-        config = load_config()
-        if config.unsafe_mode:
+        if _unsafe_mode():
             # In unsafe mode, only log warnings — never block
-            cmd_lower = command.lower().strip()
-            for pattern in DANGEROUS_PATTERNS:
-                if pattern in cmd_lower:
-                    logger.warning("⚠️  Running dangerous command (UNSAFE_MODE): %s", command)
-                    return "safe", ""
+            if _first_match(_DANGER_AC, _DANGER_RE, cmd_lower):
+                logger.warning("⚠️  Running dangerous command (UNSAFE_MODE): %s", command)
             return "safe", ""
     except Exception:
         pass
 
-    cmd_lower = command.lower().strip()
+    pattern = _first_match(_DANGER_AC, _DANGER_RE, cmd_lower)
+    if pattern:
+        return "blocked", f"Blocked: contains dangerous pattern '{pattern}'"
 
-    for pattern in DANGEROUS_PATTERNS:
-        if pattern in cmd_lower:
-            return "blocked", f"Blocked: contains dangerous pattern '{pattern}'"
-
-    for pattern in WARNING_PATTERNS:
-        if pattern in cmd_lower:
-            return "warning", f"Warning: contains potentially destructive pattern '{pattern}'"
+    pattern = _first_match(_WARNING_AC, _WARNING_RE, cmd_lower)
+    if pattern:
+        return "warning", f"Warning: contains potentially destructive pattern '{pattern}'"
 
     return "safe", ""
 
@@ -148,7 +207,7 @@ def run_command(
     timeout = min(max(timeout, 5), 120)  # Clamp between 5 and 120 seconds
 
     try:
-        result = subprocess.run(
+        result = tracked_run(
             command,
             shell=True,
             capture_output=True,
@@ -156,6 +215,7 @@ def run_command(
             timeout=timeout,
             cwd=cwd,
             env={**os.environ, "PAGER": "cat", "GIT_PAGER": "cat"},
+            start_new_session=False,  # Keep the terminal: a `sudo ...` command may need to prompt
         )
 
         output_parts = []
@@ -184,8 +244,133 @@ def run_command(
         return f"Command execution failed: {e}"
 
 
+# ── Batch Probe ──────────────────────────────────────────────
+
+@skill(
+    name="batch_probe",
+    description=(
+        "Runs several INDEPENDENT read-only shell commands in one shell and returns each one's output. "
+        "Cheaper than calling run_command repeatedly for discovery (e.g. lsmod, dmesg, ss, df). "
+        "Commands run in order; use run_command instead when one command depends on another's output."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "commands": {
+                "type": "array",
+                "description": "Commands to run, in order.",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "command": {"type": "string", "description": "The shell command."},
+                        "timeout": {"type": "integer", "description": "Seconds this command may take. Default: 10."},
+                        "ignore_errors": {
+                            "type": "boolean",
+                            "description": "Keep going if this command fails. Default: true.",
+                        },
+                    },
+                    "required": ["command"],
+                },
+            },
+        },
+        "required": ["commands"],
+    },
+)
+def batch_probe(commands: list, **kwargs) -> str:
+    cmds = [dict(c) if isinstance(c, dict) else {"command": str(c)} for c in commands or []]
+    cmds = [c for c in cmds if str(c.get("command", "")).strip()]
+    if not cmds:
+        return "No commands provided."
+
+    for c in cmds:
+        c["command"] = str(c["command"])
+        try:
+            c["timeout"] = min(max(int(c.get("timeout") or 10), 1), 120)
+        except (TypeError, ValueError):
+            return f"Invalid timeout for '{c['command']}': {c.get('timeout')!r} (expected seconds)."
+        risk, reason = _assess_command_risk(c["command"])
+        if risk == "blocked":
+            return f"🛑 BLOCKED: '{c['command']}' is too dangerous to execute.\nReason: {reason}"
+        if risk == "warning":
+            logger.warning("⚠️  Batch includes potentially risky command: %s (%s)", c["command"], reason)
+
+    # One shell for all N commands; a per-run random marker separates their outputs
+    sep = f"__MAX_BATCH_{secrets.token_hex(8)}__"
+    lines = []
+    for c in cmds:
+        lines.append(f"({c['command'].strip()}\n) 2>&1 </dev/null; __rc=$?; printf '\\n{sep} %d\\n' $__rc")
+        if not c.get("ignore_errors", True):
+            lines.append('[ "$__rc" -eq 0 ] || exit "$__rc"')
+    timeout = min(max(sum(c["timeout"] for c in cmds), 5), 120)
+
+    try:
+        result = tracked_run(
+            "\n".join(lines),
+            shell=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            cwd=os.path.expanduser("~"),
+            env={**os.environ, "PAGER": "cat", "GIT_PAGER": "cat"},
+        )
+    except subprocess.TimeoutExpired:
+        return f"Batch timed out after {timeout} seconds."
+    except Exception as e:
+        return f"Batch execution failed: {e}"
+
+    # re.split with a group yields [out0, rc0, out1, rc1, ..., tail]
+    pieces = re.split(rf"\n{sep} (\d+)\n", result.stdout)
+    sections = []
+    for i, c in enumerate(cmds):
+        header = f"[{i + 1}] $ {c['command'].strip()}"
+        if 2 * i + 1 >= len(pieces):
+            sections.append(f"{header}\n(skipped — an earlier command failed)")
+            continue
+        out, rc = pieces[2 * i].strip(), int(pieces[2 * i + 1])
+        if len(out) > 1500:
+            out = out[:1500] + "\n... (truncated)"
+        sections.append(f"{header}\n{out or '(no output)'}" + (f"\n[exit code: {rc}]" if rc else ""))
+    return "\n\n".join(sections)
+
+
 # ── Install Package ──────────────────────────────────────────
 
+def _apt_install_in_process(names: list[str], timeout: float) -> str | None:
+    """
+    Install via python-apt when already root, skipping the sudo and apt front-end processes
+    (dpkg itself still runs as a child). Returns the outcome message, or None if that isn't possible.
+    """
+    if os.geteuid() != 0:
+        return None
+    try:
+        import apt
+    except ImportError:
+        return None
+    cache = apt.Cache()
+    for name in names:
+        if name not in cache:
+            return f"Installation failed: E: Unable to locate package {name}"
+        cache[name].mark_install()
+
+    errors = []
+
+    def commit():
+        try:
+            cache.commit()
+        except Exception as e:
+            errors.append(e)
+
+    # commit() has no timeout of its own; bound the wait like the apt-get path does
+    worker = threading.Thread(target=commit, name="apt-commit", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise subprocess.TimeoutExpired(["apt", "install", *names], timeout)
+    if errors:
+        raise errors[0]
+    return f"Successfully installed {' '.join(names)} via apt."
+
+
 @skill(
     name="install_package",
     description="Installs a system package via apt or a Python package via pip.",
@@ -216,22 +401,29 @@ def install_package(
     if ";" in package_name or "&&" in package_name or "|" in package_name:
         return "Invalid package name. No shell metacharacters allowed."
 
+    # argv, not a shell string — the name can't be reinterpreted by sh
+    names = package_name.split()
     if package_manager == "apt":
-        cmd = f"sudo apt install -y {package_name}"
+        cmd = ["sudo", "apt", "install", "-y", *names]
     elif package_manager == "pip":
-        cmd = f"pip install {package_name}"
+        cmd = ["pip", "install", *names]
     else:
         return f"Unknown package manager: {package_manager}. Use 'apt' or 'pip'."
 
     logger.info("Installing package: %s (via %s)", package_name, package_manager)
 
     try:
-        result = subprocess.run(
+        if package_manager == "apt":
+            outcome = _apt_install_in_process(names, timeout=120)
+            if outcome is not None:
+                return outcome
+
+        result = tracked_run(
             cmd,
-            shell=True,
             capture_output=True,
             text=True,
             timeout=120,
+            start_new_session=False,  # sudo apt may prompt for a password
         )
 
         if result.returncode == 0:
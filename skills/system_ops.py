@@ -7,15 +7,42 @@ raw hardware diagnostic tools.
 """
 
 import datetime
+import functools
+import heapq
 import os
 import platform
+import re
 import shutil
+import signal
 import subprocess
+import time
 
 import psutil
 
 from skills import skill
 
+# Resolved once: a missing tool is skipped without a fork+exec just to hit FileNotFoundError,
+# and present ones are exec'd by absolute path instead of via a $PATH walk
+_TOOLS = {
+    name: shutil.which(name)
+    for name in ("pactl", "xrandr", "brightnessctl", "nmcli", "lshw", "lsusb", "sensors", "lsblk")
+}
+
+
+def _spawn_wait(argv: list[str]):
+    """
+    subprocess.run(argv, check=True) for the output-less hot paths (volume, brightness), via
+    posix_spawn: no Popen object, no pipes, no fd-closing pass. argv[0] must be an absolute path.
+    Like subprocess, the child gets default SIGPIPE/SIGXFSZ handling instead of Python's SIG_IGN.
+    """
+    pid = os.posix_spawn(argv[0], argv, os.environ,
+                         file_actions=[(os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0)],
+                         setsigdef=(signal.SIGPIPE, signal.SIGXFSZ))
+    _, status = os.waitpid(pid, 0)
+    returncode = os.waitstatus_to_exitcode(status)
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, argv)
+
 
 # ── Time ─────────────────────────────────────────────────────
 
@@ -30,29 +57,98 @@ def get_time(**kwargs) -> str:
 
 # ── System Info ──────────────────────────────────────────────
 
+# Fixed for the life of the process — platform.platform() reads os-release and may shell out
+_PLATFORM_STR = platform.platform()
+_BOOT_TIME = datetime.datetime.fromtimestamp(psutil.boot_time())
+
+
+def _read_proc_all() -> dict | None:
+    """
+    Everything get_system_info needs from one burst of /proc reads — stat, meminfo, uptime,
+    cpuinfo — instead of a separate round of opens per psutil call. None when not on Linux.
+    """
+    try:
+        with open("/proc/stat", "rb") as f:
+            cpu = [int(x) for x in f.read(4096).split(b"\n", 1)[0].split()[1:]]
+        with open("/proc/meminfo", "rb") as f:
+            meminfo = f.read(4096).split()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        with open("/proc/cpuinfo", "rb") as f:
+            mhz = [float(line.split(b":", 1)[1]) for line in f.read().splitlines() if line.startswith(b"cpu MHz")]
+
+        # Aggregate "cpu" line: user nice system idle iowait irq softirq steal guest guest_nice.
+        # guest time is already counted in user/nice, so leave it out of the total (as psutil does).
+        cpu_total = sum(cpu[:8])
+        cpu_idle = cpu[3] + cpu[4]  # idle + iowait
+        mem_total = int(meminfo[meminfo.index(b"MemTotal:") + 1]) * 1024  # Values are in kB
+        mem_available = int(meminfo[meminfo.index(b"MemAvailable:") + 1]) * 1024
+    except (OSError, ValueError, IndexError):  # Not Linux, or a kernel without MemAvailable
+        return None
+    return {
+        "cpu_total": cpu_total,
+        "cpu_idle": cpu_idle,
+        "mem_total": mem_total,
+        "mem_available": mem_available,
+        "uptime": uptime,
+        "mhz": sum(mhz) / len(mhz) if mhz else None,  # No "cpu MHz" lines on e.g. ARM
+    }
+
+
+# Non-blocking CPU sampling: prime the counters now, and each later call reports usage since the
+# previous one instead of sleeping a full second. A window under _CPU_MIN_WINDOW is too short to
+# mean anything, so only back-to-back calls wait — and only for the remainder.
+_CPU_MIN_WINDOW = 0.5
+_proc = _read_proc_all()
+if _proc is not None:
+    _last_cpu_times = (_proc["cpu_total"], _proc["cpu_idle"])
+else:
+    _last_cpu_times = None
+    psutil.cpu_percent(None)
+_last_cpu_sample = time.monotonic()
+del _proc
+
+
 @skill(
     name="get_system_info",
     description="Returns CPU usage, RAM usage, disk usage, and system uptime.",
 )
 def get_system_info(**kwargs) -> str:
-    cpu_percent = psutil.cpu_percent(interval=1)
-    cpu_freq = psutil.cpu_freq()
-    mem = psutil.virtual_memory()
+    global _last_cpu_sample, _last_cpu_times
+    wait = _CPU_MIN_WINDOW - (time.monotonic() - _last_cpu_sample)
+    if wait > 0:
+        time.sleep(wait)
+    _last_cpu_sample = time.monotonic()
+
+    proc = _read_proc_all()
+    if proc is not None and _last_cpu_times is not None:
+        d_total = proc["cpu_total"] - _last_cpu_times[0]
+        d_idle = proc["cpu_idle"] - _last_cpu_times[1]
+        _last_cpu_times = (proc["cpu_total"], proc["cpu_idle"])
+        cpu_percent = round(100 * (d_total - d_idle) / d_total, 1) if d_total > 0 else 0.0
+        cpu_mhz = proc["mhz"] if proc["mhz"] is not None else psutil.cpu_freq().current
+        mem_total = proc["mem_total"]
+        mem_used = mem_total - proc["mem_available"]
+        mem_percent = round(100 * mem_used / mem_total, 1)
+        uptime_seconds = proc["uptime"]
+    else:
+        cpu_percent = psutil.cpu_percent(None)
+        cpu_mhz = psutil.cpu_freq().current
+        mem = psutil.virtual_memory()
+        mem_total, mem_used, mem_percent = mem.total, mem.used, mem.percent
+        uptime_seconds = (datetime.datetime.now() - _BOOT_TIME).total_seconds()
     disk = shutil.disk_usage("/")
-    uptime_seconds = (
-        datetime.datetime.now() - datetime.datetime.fromtimestamp(psutil.boot_time())
-    ).total_seconds()
 
     hours, remainder = divmod(int(uptime_seconds), 3600)
     minutes, _ = divmod(remainder, 60)
 
     return (
-        f"CPU: {cpu_percent}% usage ({cpu_freq.current:.0f} MHz)\n"
-        f"RAM: {mem.percent}% used ({mem.used / (1024**3):.1f} GB / {mem.total / (1024**3):.1f} GB)\n"
+        f"CPU: {cpu_percent}% usage ({cpu_mhz:.0f} MHz)\n"
+        f"RAM: {mem_percent}% used ({mem_used / (1024**3):.1f} GB / {mem_total / (1024**3):.1f} GB)\n"
         f"Disk: {disk.used / (1024**3):.1f} GB used / {disk.total / (1024**3):.1f} GB total "
         f"({disk.free / (1024**3):.1f} GB free)\n"
         f"Uptime: {hours}h {minutes}m\n"
-        f"OS: {platform.platform()}"
+        f"OS: {_PLATFORM_STR}"
     )
 
 
@@ -95,12 +191,15 @@ def get_battery(**kwargs) -> str:
 )
 def set_volume(level: str = "50", **kwargs) -> str:
     level = level.strip().lower()
+    pactl = _TOOLS["pactl"]
+    if not pactl:
+        return "Could not change volume: 'pactl' is not installed. You should run: sudo apt install pulseaudio-utils"
 
     if level == "mute":
-        subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "toggle"], check=True)
+        _spawn_wait([pactl, "set-sink-mute", "@DEFAULT_SINK@", "toggle"])
         return "Audio muted."
     elif level == "unmute":
-        subprocess.run(["pactl", "set-sink-mute", "@DEFAULT_SINK@", "0"], check=True)
+        _spawn_wait([pactl, "set-sink-mute", "@DEFAULT_SINK@", "0"])
         return "Audio unmuted."
     else:
         try:
@@ -108,15 +207,37 @@ def set_volume(level: str = "50", **kwargs) -> str:
         except ValueError:
             return f"Invalid volume level: '{level}'. Use a number 0-100, 'mute', or 'unmute'."
 
-        subprocess.run(
-            ["pactl", "set-sink-volume", "@DEFAULT_SINK@", f"{vol}%"],
-            check=True,
-        )
+        _spawn_wait([pactl, "set-sink-volume", "@DEFAULT_SINK@", f"{vol}%"])
         return f"Volume set to {vol}%."
 
 
 # ── Brightness Control ──────────────────────────────────────
 
+# Backend that last worked ("xrandr" / "sysfs" / "brightnessctl") and the xrandr output it drove,
+# so repeat calls skip the probe chain. Cleared on failure or by force_refresh (hotplug).
+_BRIGHTNESS_BACKEND = None
+_MONITOR_NAME = None
+
+_BACKLIGHT_ROOT = "/sys/class/backlight"
+
+
+@functools.lru_cache(maxsize=1)
+def _backlight_dev():
+    """(sysfs directory, max_brightness) of the first backlight device, or None."""
+    try:
+        names = sorted(os.listdir(_BACKLIGHT_ROOT))
+    except OSError:
+        return None
+    for name in names:
+        path = os.path.join(_BACKLIGHT_ROOT, name)
+        try:
+            with open(os.path.join(path, "max_brightness")) as f:
+                return path, int(f.read())
+        except (OSError, ValueError):
+            continue
+    return None
+
+
 @skill(
     name="set_brightness",
     description="Sets the screen brightness to a percentage (1-100).",
@@ -126,39 +247,69 @@ def set_volume(level: str = "50", **kwargs) -> str:
             "level": {
                 "type": "integer",
                 "description": "Brightness level from 1 to 100."
+            },
+            "force_refresh": {
+                "type": "boolean",
+                "description": "Re-detect the brightness backend and monitor (e.g. after plugging in a display)."
             }
         },
         "required": ["level"]
     }
 )
-def set_brightness(level: int = 50, **kwargs) -> str:
+def set_brightness(level: int = 50, force_refresh: bool = False, **kwargs) -> str:
+    global _BRIGHTNESS_BACKEND, _MONITOR_NAME
     level = max(1, min(100, int(level)))
 
-    try:
-        result = subprocess.run(
-            ["xrandr", "--listmonitors"],
-            capture_output=True, text=True, check=True,
-        )
-        lines = result.stdout.strip().split("\n")
-        if len(lines) > 1:
-            monitor = lines[1].split()[-1]
-            brightness = level / 100.0
+    if force_refresh:
+        _BRIGHTNESS_BACKEND = _MONITOR_NAME = None
+        _backlight_dev.cache_clear()
+
+    # --current: use the server's current configuration instead of making it re-probe every
+    # output (DDC/EDID polling can take hundreds of ms); the monitor list only comes from hotplug
+    if _TOOLS["xrandr"] and _BRIGHTNESS_BACKEND in (None, "xrandr"):
+        try:
+            if _MONITOR_NAME is None:
+                result = subprocess.run(
+                    [_TOOLS["xrandr"], "--current", "--listmonitors"],
+                    capture_output=True, text=True, check=True,
+                )
+                lines = result.stdout.strip().split("\n")
+                if len(lines) > 1:
+                    _MONITOR_NAME = lines[1].split()[-1]
+            if _MONITOR_NAME is not None:
+                brightness = level / 100.0
+                _spawn_wait([_TOOLS["xrandr"], "--current", "--output", _MONITOR_NAME, "--brightness", str(brightness)])
+                _BRIGHTNESS_BACKEND = "xrandr"
+                return f"Brightness set to {level}% (via xrandr)."
+        except (subprocess.CalledProcessError, FileNotFoundError, IndexError):
+            _MONITOR_NAME = None
+        _BRIGHTNESS_BACKEND = None
+
+    # Same sysfs write brightnessctl would do, minus the fork/exec. Needs the file to be
+    # writable (video group / udev rule); on PermissionError fall through to brightnessctl.
+    if _BRIGHTNESS_BACKEND in (None, "sysfs"):
+        dev = _backlight_dev()
+        if dev is not None:
+            path, max_brightness = dev
+            try:
+                with open(os.path.join(path, "brightness"), "w") as f:
+                    f.write(str(max(1, level * max_brightness // 100)))
+                _BRIGHTNESS_BACKEND = "sysfs"
+                return f"Brightness set to {level}% (via sysfs backlight)."
+            except OSError:
+                pass
+        _BRIGHTNESS_BACKEND = None
+
+    if _TOOLS["brightnessctl"]:
+        try:
             subprocess.run(
-                ["xrandr", "--output", monitor, "--brightness", str(brightness)],
-                check=True,
+                [_TOOLS["brightnessctl"], "set", f"{level}%"],
+                check=True, capture_output=True,
             )
-            return f"Brightness set to {level}% (via xrandr)."
-    except (subprocess.CalledProcessError, FileNotFoundError, IndexError):
-        pass
-
-    try:
-        subprocess.run(
-            ["brightnessctl", "set", f"{level}%"],
-            check=True, capture_output=True,
-        )
-        return f"Brightness set to {level}% (via brightnessctl)."
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
+            _BRIGHTNESS_BACKEND = "brightnessctl"
+            return f"Brightness set to {level}% (via brightnessctl)."
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            _BRIGHTNESS_BACKEND = None
 
     return (
         f"Could not set brightness to {level}%. "
@@ -168,11 +319,19 @@ def set_brightness(level: int = 50, **kwargs) -> str:
 
 # ── Network Info ─────────────────────────────────────────────
 
+_NET_CACHE_TTL = 5  # Seconds — the agent often asks several times in one turn; addresses/SSID rarely change
+_net_cache = {"ts": 0.0, "val": None}
+
+
 @skill(
     name="get_network_info",
     description="Returns current network connection status, IP addresses, and Wi-Fi SSID.",
 )
 def get_network_info(**kwargs) -> str:
+    now = time.monotonic()
+    if _net_cache["val"] is not None and now - _net_cache["ts"] < _NET_CACHE_TTL:
+        return _net_cache["val"]
+
     info_parts = []
     addrs = psutil.net_if_addrs()
     stats = psutil.net_if_stats()
@@ -186,24 +345,106 @@ def get_network_info(**kwargs) -> str:
                 if addr.family.name == "AF_INET":
                     info_parts.append(f"{iface}: {addr.address}")
 
-    try:
-        result = subprocess.run(
-            ["nmcli", "-t", "-f", "active,ssid", "dev", "wifi"],
-            capture_output=True, text=True, check=True,
-        )
-        for line in result.stdout.strip().split("\n"):
-            if line.startswith("yes:"):
-                ssid = line.split(":", 1)[1]
-                info_parts.append(f"Wi-Fi: {ssid}")
-                break
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
+    if _TOOLS["nmcli"]:
+        try:
+            # --rescan no: list NM's cached scan results instead of possibly triggering a new scan
+            result = subprocess.run(
+                [_TOOLS["nmcli"], "-t", "-f", "active,ssid", "dev", "wifi", "list", "--rescan", "no"],
+                capture_output=True, check=True,
+            )
+            # Bytes in, one decode of the matching line — no text-mode decoding of the whole scan list
+            for line in result.stdout.splitlines():
+                if line.startswith(b"yes:"):
+                    ssid = line.split(b":", 1)[1].decode(errors="replace")
+                    info_parts.append(f"Wi-Fi: {ssid}")
+                    break
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            pass
 
-    return "\n".join(info_parts) if info_parts else "No active network connections found."
+    val = "\n".join(info_parts) if info_parts else "No active network connections found."
+    _net_cache.update(ts=now, val=val)
+    return val
 
 
 # ── Process List ─────────────────────────────────────────────
 
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+_PHYS_PAGES = os.sysconf("SC_PHYS_PAGES")
+
+
+def _read_proc_stats():
+    """
+    One pass over /proc/<pid>/stat — a single open per process, versus the several files a
+    psutil.Process reads. Returns parallel lists: pids, names, CPU ticks (utime+stime), RSS pages.
+    """
+    pids, names, ticks, rss = [], [], [], []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                data = f.read()
+            # comm is parenthesised and may itself contain spaces or ')' — split at the last ')'
+            rpar = data.rindex(b")")
+            fields = data[rpar + 2:].split()  # fields[0] is stat field 3 (state)
+            cpu_ticks = int(fields[11]) + int(fields[12])  # utime, stime
+            rss_pages = int(fields[21])
+        except (OSError, ValueError, IndexError):
+            continue  # Exited between listdir and open
+        pids.append(int(entry))
+        names.append(data[data.index(b"(") + 1:rpar].decode(errors="replace"))
+        ticks.append(cpu_ticks)
+        rss.append(rss_pages)
+    return pids, names, ticks, rss
+
+
+def _top_processes_procfs(by_cpu: bool, count: int):
+    pids, names, ticks, rss = _read_proc_stats()
+    cpu = None
+    if by_cpu:
+        # CPU% needs two samples: diff each process's ticks over a 0.1s window
+        before = dict(zip(pids, ticks))
+        t0 = time.monotonic()
+        time.sleep(0.1)
+        pids, names, ticks, rss = _read_proc_stats()
+        elapsed = time.monotonic() - t0
+        cpu = [100 * (t - before.get(pid, t)) / _CLK_TCK / elapsed for pid, t in zip(pids, ticks)]
+    mem = [100 * r / _PHYS_PAGES for r in rss]
+
+    metric = cpu if by_cpu else mem
+    top = heapq.nlargest(count, range(len(pids)), key=metric.__getitem__)
+    return [(pids[i], names[i], cpu[i] if by_cpu else None, mem[i]) for i in top]
+
+
+def _top_processes_psutil(by_cpu: bool, count: int):
+    if by_cpu:
+        # cpu_percent() is 0.0 on a process's first sample — prime every process, then measure
+        for p in psutil.process_iter():
+            try:
+                p.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        time.sleep(0.1)
+        attrs = ["pid", "name", "cpu_percent", "memory_percent"]
+    else:
+        attrs = ["pid", "name", "memory_percent"]  # Skip the per-process CPU stat reads entirely
+
+    procs = []
+    for p in psutil.process_iter(attrs):
+        try:
+            info = p.info
+            procs.append(info)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
+    key = "cpu_percent" if by_cpu else "memory_percent"
+    procs.sort(key=lambda x: x.get(key, 0) or 0, reverse=True)
+    return [
+        (p["pid"], p["name"], (p.get("cpu_percent") or 0) if by_cpu else None, p.get("memory_percent") or 0)
+        for p in procs[:count]
+    ]
+
+
 @skill(
     name="list_running_processes",
     description="Lists the top active processes by CPU or memory usage.",
@@ -216,23 +457,19 @@ def get_network_info(**kwargs) -> str:
     }
 )
 def list_running_processes(sort_by: str = "cpu", count: int = 10, **kwargs) -> str:
-    procs = []
-    for p in psutil.process_iter(["pid", "name", "cpu_percent", "memory_percent"]):
-        try:
-            info = p.info
-            procs.append(info)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-
-    key = "cpu_percent" if sort_by.lower() == "cpu" else "memory_percent"
-    procs.sort(key=lambda x: x.get(key, 0) or 0, reverse=True)
+    by_cpu = sort_by.lower() == "cpu"
+    try:
+        rows = _top_processes_procfs(by_cpu, count)
+    except OSError:  # No procfs — let psutil handle the platform
+        rows = _top_processes_psutil(by_cpu, count)
 
     lines = [f"Top {count} processes by {sort_by}:"]
-    for p in procs[:count]:
+    for pid, name, cpu, mem in rows:
+        cpu = f"{cpu:>5.1f}%" if cpu is not None else "  n/a "
         lines.append(
-            f"  PID {p['pid']:>6} | {p['name']:<25} | "
-            f"CPU: {p.get('cpu_percent', 0):>5.1f}% | "
-            f"MEM: {p.get('memory_percent', 0):>5.1f}%"
+            f"  PID {pid:>6} | {name:<25} | "
+            f"CPU: {cpu} | "
+            f"MEM: {mem:>5.1f}%"
         )
 
     return "\n".join(lines)
@@ -245,8 +482,10 @@ def list_running_processes(sort_by: str = "cpu", count: int = 10, **kwargs) -> s
     description="Returns detailed physical hardware information (CPU architecture, RAM, motherboard, disks).",
 )
 def get_hardware_info(**kwargs) -> str:
+    if not _TOOLS["lshw"]:
+        return "The 'lshw' command is not installed. You should run: sudo apt install lshw"
     try:
-        result = subprocess.run(["sudo", "lshw", "-short"], capture_output=True, text=True, check=True)
+        result = subprocess.run(["sudo", _TOOLS["lshw"], "-short"], capture_output=True, text=True, check=True)
         return f"Hardware Profile:\n{result.stdout}"
     except Exception as e:
         return f"Failed to retrieve hardware profile: {e}"
@@ -256,19 +495,69 @@ def get_hardware_info(**kwargs) -> str:
     description="Lists all physical USB devices currently connected to the machine.",
 )
 def get_usb_devices(**kwargs) -> str:
+    if not _TOOLS["lsusb"]:
+        return "The 'lsusb' command is not installed. You should run: sudo apt install usbutils"
     try:
-        result = subprocess.run(["lsusb"], capture_output=True, text=True, check=True)
+        result = subprocess.run([_TOOLS["lsusb"]], capture_output=True, text=True, check=True)
         return f"USB Devices:\n{result.stdout}"
     except Exception as e:
         return f"Failed to list USB devices: {e}"
 
+_HWMON_ROOT = "/sys/class/hwmon"
+_HWMON_INPUT_RE = re.compile(r"(temp|fan)(\d+)_input$")
+
+
+def _read_sysfs(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:  # Missing attribute, or a sensor that errors on read (ENODATA/EIO)
+        return None
+
+
+def _read_hwmon() -> str:
+    """sensors-style report read straight from /sys/class/hwmon; '' when there is nothing there."""
+    try:
+        chips = sorted(os.listdir(_HWMON_ROOT), key=lambda c: (len(c), c))  # hwmon2 before hwmon10
+    except OSError:
+        return ""
+
+    blocks = []
+    for chip in chips:
+        base = os.path.join(_HWMON_ROOT, chip)
+        try:
+            matches = [_HWMON_INPUT_RE.match(f) for f in os.listdir(base)]
+        except OSError:
+            continue
+        lines = []
+        for kind, n in sorted((m.group(1), int(m.group(2))) for m in matches if m):
+            raw = _read_sysfs(f"{base}/{kind}{n}_input")
+            if raw is None or not raw.lstrip("-").isdigit():
+                continue
+            label = _read_sysfs(f"{base}/{kind}{n}_label") or f"{kind}{n}"
+            if kind == "temp":
+                lines.append(f"  {label}: {int(raw) / 1000:.1f}°C")  # Millidegrees Celsius
+            else:
+                lines.append(f"  {label}: {raw} RPM")
+        if lines:
+            blocks.append(f"{_read_sysfs(f'{base}/name') or chip}:\n" + "\n".join(lines))
+    return "\n".join(blocks)
+
+
 @skill(
     name="get_cpu_thermals",
     description="Returns raw physical sensory data for CPU/GPU core temperatures and fan speeds.",
 )
 def get_cpu_thermals(**kwargs) -> str:
+    # Plain file reads — no fork/exec of `sensors` (and no stutter from it) when hwmon is populated
+    report = _read_hwmon()
+    if report:
+        return f"Thermal Sensors:\n{report}"
+
+    if not _TOOLS["sensors"]:
+        return "The 'sensors' command is not installed. You should run: sudo apt install lm-sensors"
     try:
-        result = subprocess.run(["sensors"], capture_output=True, text=True, check=True)
+        result = subprocess.run([_TOOLS["sensors"]], capture_output=True, text=True, check=True)
         return f"Thermal Sensors:\n{result.stdout}"
     except FileNotFoundError:
         return "The 'sensors' command is not installed. You should run: sudo apt install lm-sensors"
@@ -280,8 +569,10 @@ def get_cpu_thermals(**kwargs) -> str:
     description="Lists all physical drive block devices, SSDs, NVMes, and storage partitions.",
 )
 def get_disk_partitions(**kwargs) -> str:
+    if not _TOOLS["lsblk"]:
+        return "The 'lsblk' command is not installed. You should run: sudo apt install util-linux"
     try:
-        result = subprocess.run(["lsblk", "-o", "NAME,SIZE,TYPE,MOUNTPOINT"], capture_output=True, text=True, check=True)
+        result = subprocess.run([_TOOLS["lsblk"], "-o", "NAME,SIZE,TYPE,MOUNTPOINT"], capture_output=True, text=True, check=True)
         return f"Block Devices:\n{result.stdout}"
     except Exception as e:
         return f"Failed to list block devices: {e}"
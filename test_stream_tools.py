@@ -1,4 +1,8 @@
+import sys
+import time
+
 import ollama
+CLIENT = ollama.Client(host="http://localhost:11434", timeout=120)
 tools = [{
   "type": "function",
   "function": {
@@ -7,6 +11,18 @@ tools = [{
     "parameters": {"type": "object", "properties": {"location": {"type": "string"}}}
   }
 }]
-stream = ollama.chat(model='qwen2.5:3b', messages=[{"role": "user", "content": "What's the weather in Tokyo?"}], tools=tools, stream=True)
+# keep_alive keeps the model loaded between runs; a 2k context halves the KV cache for this short prompt
+stream = CLIENT.chat(model='qwen2.5:3b', messages=[{"role": "user", "content": "What's the weather in Tokyo?"}], tools=tools, stream=True,
+                     keep_alive='10m', options={"num_ctx": 2048})
+# Batch chunks and write them every 50 ms rather than one print() per token
+buf = []
+last = time.monotonic()
 for chunk in stream:
-    print(chunk)
+    buf.append(str(chunk))
+    if time.monotonic() - last > 0.05:
+        sys.stdout.write("\n".join(buf) + "\n")
+        buf.clear()
+        last = time.monotonic()
+if buf:
+    sys.stdout.write("\n".join(buf) + "\n")
+sys.stdout.flush()
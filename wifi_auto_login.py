@@ -6,10 +6,15 @@ Automatically detects and logs into the Providence_Faculty captive portal.
 Runs in a loop checking connectivity and re-authenticating as needed.
 """
 
+import json
 import logging
+import os
 import subprocess
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [wifi-login] %(message)s")
 logger = logging.getLogger("wifi-login")
@@ -34,24 +39,38 @@ PORTAL_URLS = [
     "http://neverssl.com",
 ]
 
+# Form fields that last logged in, per portal host — tried first next time
+KNOWN_VARIANTS_FILE = os.path.expanduser("~/.cache/wifi_auto_login.json")
+
+# One session for the daemon's lifetime: probes reuse keep-alive connections instead of a
+# fresh DNS lookup + TCP handshake each time. (Portal logins keep their own cookie-scoped session.)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=0))
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=0))
+
 
 def is_connected():
     """Check if we have real internet access (not captive portal)."""
-    for url in CHECK_URLS:
-        try:
-            r = requests.get(url, timeout=5, allow_redirects=False)
-            if r.status_code == 204:
-                return True
-        except Exception:
-            continue
-    return False
+    # Probe every URL at once and answer on the first 204 — worst case is one timeout, not three
+    pool = ThreadPoolExecutor(max_workers=len(CHECK_URLS))
+    try:
+        futures = [pool.submit(SESSION.head, url, timeout=3, allow_redirects=False) for url in CHECK_URLS]
+        for future in as_completed(futures):
+            try:
+                if future.result().status_code == 204:
+                    return True
+            except Exception:
+                continue
+        return False
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # Don't wait on the slower probes
 
 
 def get_redirect_url():
     """Detect captive portal by following redirects."""
     try:
-        r = requests.get("http://connectivitycheck.gstatic.com/generate_204",
-                         timeout=10, allow_redirects=True)
+        r = SESSION.get("http://connectivitycheck.gstatic.com/generate_204",
+                        timeout=10, allow_redirects=True)
         if r.status_code != 204 and r.url != "http://connectivitycheck.gstatic.com/generate_204":
             logger.info("Captive portal detected at: %s", r.url)
             return r.url
@@ -62,6 +81,67 @@ def get_redirect_url():
     return None
 
 
+def load_known_variants():
+    try:
+        with open(KNOWN_VARIANTS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_known_variant(host, form_data):
+    known = load_known_variants()
+    known[host] = list(form_data.keys())
+    try:
+        os.makedirs(os.path.dirname(KNOWN_VARIANTS_FILE), exist_ok=True)
+        with open(KNOWN_VARIANTS_FILE, "w") as f:
+            json.dump(known, f)
+    except OSError as e:
+        logger.debug("Could not save portal variant: %s", e)
+
+
+def _post_variant(cookies, url, form_data):
+    """POST one form variant from its own session, so concurrent variants can't mix cookies."""
+    with requests.Session() as session:
+        session.cookies.update(cookies)
+        r = session.post(url, data=form_data, timeout=10, allow_redirects=True)
+    logger.info("POST %s -> %d (tried: %s)", url, r.status_code, list(form_data.keys()))
+    return form_data
+
+
+def _post_concurrently(cookies, attempts, host):
+    """
+    Fire every (url, form_data) POST at once and poll connectivity every 0.5s while they land;
+    stop at the first sign of internet. A variant is only remembered as known-good when the
+    credit is unambiguous: it was the single POST to complete since connectivity was last down.
+    """
+    pool = ThreadPoolExecutor(max_workers=len(attempts))
+    try:
+        pending = {pool.submit(_post_variant, cookies, url, data) for url, data in attempts}
+        any_done = False
+        since_check = []  # Variants whose POST completed since the last negative check
+        while True:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                any_done = True
+                try:
+                    since_check.append(future.result())
+                except Exception as e:
+                    logger.debug("Form submit error: %s", e)
+            if not pending:
+                time.sleep(0.5)  # Give the portal a moment to apply the last login
+            if any_done:
+                if is_connected():
+                    if len(since_check) == 1:
+                        save_known_variant(host, since_check[0])
+                    return True
+                since_check.clear()
+            if not pending:
+                return False
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # Stragglers finish in the background
+
+
 def attempt_portal_login(portal_url):
     """Try to authenticate with the captive portal."""
     session = requests.Session()
@@ -89,20 +169,19 @@ def attempt_portal_login(portal_url):
             {"email": PORTAL_USER, "password": PORTAL_PASS},
         ]
 
-        for form_data in form_data_variants:
-            try:
-                r = session.post(login_url, data=form_data, timeout=10,
-                                 allow_redirects=True)
-                logger.info("POST %s -> %d (tried: %s)", login_url,
-                            r.status_code, list(form_data.keys()))
-
-                # Check if we now have internet
-                time.sleep(2)
-                if is_connected():
-                    logger.info("✅ Portal login successful!")
-                    return True
-            except Exception as e:
-                logger.debug("Form submit error: %s", e)
+        # Put the fields that worked on this portal last time first
+        host = urlparse(login_url).netloc
+        known_keys = load_known_variants().get(host)
+        form_data_variants.sort(key=lambda v: list(v.keys()) != known_keys)
+
+        # Known-good fields get a solo attempt before the rest are sprayed at the portal
+        batches = [form_data_variants]
+        if known_keys and list(form_data_variants[0].keys()) == known_keys:
+            batches = [form_data_variants[:1], form_data_variants[1:]]
+        for batch in batches:
+            if _post_concurrently(session.cookies, [(login_url, v) for v in batch], host):
+                logger.info("✅ Portal login successful!")
+                return True
 
         # Pattern 2: Try URL-encoded login at common endpoints
         login_endpoints = [
@@ -111,16 +190,10 @@ def attempt_portal_login(portal_url):
             login_url.rstrip("/") + "/authenticate",
         ]
 
-        for endpoint in login_endpoints:
-            for form_data in form_data_variants[:2]:
-                try:
-                    r = session.post(endpoint, data=form_data, timeout=10)
-                    time.sleep(2)
-                    if is_connected():
-                        logger.info("✅ Portal login successful via %s!", endpoint)
-                        return True
-                except Exception:
-                    continue
+        attempts = [(endpoint, v) for endpoint in login_endpoints for v in form_data_variants[:2]]
+        if _post_concurrently(session.cookies, attempts, host):
+            logger.info("✅ Portal login successful via a login endpoint!")
+            return True
 
     except Exception as e:
         logger.error("Portal login attempt failed: %s", e)
@@ -199,7 +272,7 @@ def main():
                 # Try common portal URLs directly
                 for url in PORTAL_URLS:
                     try:
-                        r = requests.get(url, timeout=5)
+                        r = SESSION.get(url, timeout=5)
                         if r.status_code == 200 and len(r.text) > 100:
                             if attempt_portal_login(url):
                                 break